@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Compare ParallelReader, with different numbers of workers, against
+Reader on the same file.
+
+    python benchmarks/parallel_read.py [rows]
+
+ParallelReader only wins with several free cores, since the rows it
+parses have to be unpickled again in this process.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from csvx import ParallelReader, Reader, Writer
+
+ROWS = 1000000
+
+
+def best_of(f, repeat=3):
+    times = []
+
+    for _ in range(repeat):
+        start = time.time()
+        f()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'test.csv')
+
+    try:
+        with Writer(path) as w:
+            w.write_rows([i, 'François', 'has, comma', 72000000, 1.5,
+                          'two\nlines'] for i in range(rows))
+
+        def serial():
+            with Reader(path) as r:
+                for row in r:
+                    pass
+
+        baseline = best_of(serial)
+        print('{} MB, {} CPUs'.format(os.path.getsize(path) // 2 ** 20,
+                                      multiprocessing.cpu_count()))
+        print('Reader:              {:.2f}s'.format(baseline))
+
+        for workers in (1, 2, 4, 8):
+            def parallel():
+                with ParallelReader(path, workers=workers) as r:
+                    for row in r:
+                        pass
+
+            seconds = best_of(parallel)
+            print('ParallelReader({}): {:6.2f}s   ({:.2f}x)'.format(
+                workers, seconds, baseline / seconds))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
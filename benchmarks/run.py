@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the csvx readers, writers and convenience functions,
+each measured against the equivalent use of the stdlib csv module.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json
+
+Results are written as json. With --compare, each benchmark is checked
+against the same benchmark in an earlier results file, and the exit status
+is non-zero if any of them got more than --threshold times slower.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+from collections import OrderedDict
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import six
+
+import csvx
+
+# name, width, quoting density (fraction of values needing quotes), unicode
+DATASETS = [
+    ('narrow', 5, 0.0, False),
+    ('wide', 50, 0.0, False),
+    ('quoted', 10, 0.5, False),
+    ('unicode', 10, 0.1, True),
+]
+
+ASCII_WORDS = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', '72000000',
+               'False', '2012-10-01 00:00:00.000000', '-infinity', '']
+UNICODE_WORDS = ['François', 'Ünïcödé', '日本語', 'Ελληνικά', 'emoji 🎉']
+QUOTED_WORDS = ['has, comma', 'has "quotes"', 'two\nlines']
+
+
+def generate(rows, width, quoting, unicode, seed=0):
+    r = random.Random(seed)
+    words = ASCII_WORDS + (UNICODE_WORDS if unicode else [])
+
+    header = ['column_{}'.format(i) for i in range(width)]
+
+    def value():
+        if r.random() < quoting:
+            return r.choice(QUOTED_WORDS)
+        return r.choice(words)
+
+    return header, [[value() for _ in range(width)] for _ in range(rows)]
+
+
+def to_native(text):
+    # the stdlib csv module on python 2 reads and writes bytes
+    return text.encode('utf-8') if six.PY2 else text
+
+
+def stdlib_open(path, mode):
+    if six.PY2:
+        return open(path, mode + 'b')
+    return io.open(path, mode, newline='', encoding='utf-8')
+
+
+def benchmarks(path, text, header, rows, dicts):
+    """Pairs of (csvx, stdlib) functions for each benchmark.
+    """
+
+    def csvx_reader():
+        with csvx.Reader(path) as r:
+            for row in r:
+                pass
+
+    def stdlib_reader():
+        with stdlib_open(path, 'r') as f:
+            for row in csv.reader(f):
+                pass
+
+    def csvx_dictreader():
+        with csvx.OrderedDictReader(path) as r:
+            for row in r:
+                pass
+
+    def stdlib_dictreader():
+        with stdlib_open(path, 'r') as f:
+            for row in csv.DictReader(f):
+                pass
+
+    def csvx_writer():
+        with csvx.Writer(path + '.out') as w:
+            w.write_rows([header] + rows)
+
+    def stdlib_writer():
+        with stdlib_open(path + '.out', 'w') as f:
+            csv.writer(f).writerows([header] + rows)
+
+    def csvx_dictwriter():
+        with csvx.DictWriter(path + '.out') as w:
+            w.write_dicts(dicts)
+
+    def stdlib_dictwriter():
+        with stdlib_open(path + '.out', 'w') as f:
+            w = csv.DictWriter(f, fieldnames=header)
+            w.writeheader()
+            w.writerows(dicts)
+
+    native = to_native(text)
+
+    def csvx_ordereddicts_from_text():
+        for row in csvx.ordereddicts_from_text(text):
+            pass
+
+    def stdlib_ordereddicts_from_text():
+        for row in csv.DictReader(six.StringIO(native)):
+            pass
+
+    def csvx_text_from_dicts():
+        csvx.text_from_dicts(dicts)
+
+    def stdlib_text_from_dicts():
+        out = six.StringIO()
+        w = csv.DictWriter(out, fieldnames=header)
+        w.writeheader()
+        w.writerows(dicts)
+        out.getvalue()
+
+    sample = native[:64 * 1024]
+
+    def csvx_sniff_text():
+        csvx.sniff_text(sample)
+
+    def stdlib_sniff_text():
+        csv.Sniffer().sniff(sample)
+
+    return OrderedDict([
+        ('Reader', (csvx_reader, stdlib_reader)),
+        ('OrderedDictReader', (csvx_dictreader, stdlib_dictreader)),
+        ('Writer', (csvx_writer, stdlib_writer)),
+        ('DictWriter', (csvx_dictwriter, stdlib_dictwriter)),
+        ('ordereddicts_from_text', (csvx_ordereddicts_from_text,
+                                    stdlib_ordereddicts_from_text)),
+        ('text_from_dicts', (csvx_text_from_dicts, stdlib_text_from_dicts)),
+        ('sniff_text', (csvx_sniff_text, stdlib_sniff_text)),
+    ])
+
+
+def best_of(f, repeat):
+    times = []
+
+    for _ in range(repeat):
+        start = time.time()
+        f()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def run(rows, repeat, only=None):
+    results = []
+    tmpdir = tempfile.mkdtemp()
+
+    try:
+        for name, width, quoting, unicode in DATASETS:
+            header, data = generate(rows, width, quoting, unicode)
+            path = os.path.join(tmpdir, name + '.csv')
+
+            with csvx.Writer(path) as w:
+                w.write_rows([header] + data)
+
+            with io.open(path) as f:
+                text = f.read()
+
+            dicts = [OrderedDict(zip(header, row)) for row in data]
+
+            for bench, (f, baseline) in benchmarks(path, text, header, data,
+                                                   dicts).items():
+                if only and bench not in only:
+                    continue
+
+                seconds = best_of(f, repeat)
+                baseline_seconds = best_of(baseline, repeat)
+
+                result = OrderedDict([
+                    ('benchmark', bench),
+                    ('dataset', name),
+                    ('rows', rows),
+                    ('width', width),
+                    ('seconds', seconds),
+                    ('rows_per_second', rows / seconds if seconds else None),
+                    ('stdlib_seconds', baseline_seconds),
+                    ('vs_stdlib', seconds / baseline_seconds
+                     if baseline_seconds else None),
+                ])
+                results.append(result)
+
+                print('{:24} {:8} {:>10.4f}s  stdlib {:>10.4f}s  '
+                      '({:.2f}x)'.format(bench, name, seconds,
+                                         baseline_seconds,
+                                         result['vs_stdlib'] or 0))
+    finally:
+        shutil.rmtree(tmpdir)
+    return results
+
+
+def compare(results, previous, threshold):
+    """Return the benchmarks that got more than `threshold` times slower
+    than they were in `previous`.
+    """
+    before = {(r['benchmark'], r['dataset']): r for r in previous['results']}
+    slower = []
+
+    for r in results:
+        old = before.get((r['benchmark'], r['dataset']))
+
+        if old and old['seconds'] and \
+                r['seconds'] / old['seconds'] > threshold:
+            slower.append((r, old))
+    return slower
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='*',
+                        help='names of the benchmarks to run')
+    parser.add_argument('--output', help='write results to this json file')
+    parser.add_argument('--compare', help='json file of earlier results')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    options = parser.parse_args(args)
+
+    results = run(options.rows, options.repeat, options.only)
+
+    output = OrderedDict([
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('time', time.time()),
+        ('results', results),
+    ])
+
+    if options.output:
+        with io.open(options.output, 'w') as f:
+            f.write(six.text_type(json.dumps(output, indent=2)))
+
+    if options.compare:
+        with io.open(options.compare) as f:
+            previous = json.load(f)
+
+        slower = compare(results, previous, options.threshold)
+
+        for r, old in slower:
+            print('SLOWER: {} on {}: {:.4f}s, was {:.4f}s'.format(
+                r['benchmark'], r['dataset'], r['seconds'], old['seconds']))
+
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import time
+
+from csvx import Writer, to_text
+
+ROWS = 200000
+
+
+def text_rows(n):
+    return [['row {}'.format(i), 'François', 'some text', '72000000',
+             'False', '2012-10-01 00:00:00.000000'] for i in range(n)]
+
+
+def mixed_rows(n):
+    return [[i, 'François', b'some bytes', 72000000, False, 1.5]
+            for i in range(n)]
+
+
+def one_at_a_time(w, rows):
+    # the original write_rows: to_text every value, one writerow per row
+    for row in rows:
+        w.writer.writerow([to_text(s) for s in row])
+        w.row_count += 1
+
+
+def batched(w, rows):
+    w.write_rows(rows)
+
+
+def measure(method, rows):
+    out = io.StringIO()
+    w = Writer(out)
+    start = time.time()
+    method(w, rows)
+    w.flush()  # python 2 queues rows up before writing them
+    elapsed = time.time() - start
+    return len(rows) / elapsed, out.getvalue()
+
+
+def main():
+    for name, make in [('text', text_rows), ('mixed', mixed_rows)]:
+        rows = make(ROWS)
+        before, before_out = measure(one_at_a_time, rows)
+        after, after_out = measure(batched, rows)
+        assert before_out == after_out
+
+        print('{:6} per row: {:>10.0f} rows/sec   write_rows: {:>10.0f} '
+              'rows/sec   ({:.2f}x)'.format(name, before, after,
+                                            after / before))
+
+
+if __name__ == '__main__':
+    main()
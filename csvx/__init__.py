@@ -1,14 +1,37 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import six
+
 from .csv import \
-    Reader, OrderedDictReader, \
+    Reader, OrderedDictReader, NamedTupleReader, TypedReader, \
     Writer, DictWriter, \
     to_text, to_bytes, to_str, from_str, \
-    text_from_dicts, ordereddicts_from_text, sniff_text
+    text_from_dicts, ordereddicts_from_text, sniff_text, sniff_file, \
+    sniff_stream
+from .parallel import ParallelReader, ParallelWriter
+from .columns import ColumnReader
+from .selection import between
+from .sorting import sort
+from .aggregation import aggregate
+from .joins import join
+from .diffing import Change, diff
+from .tail import Checkpoint, TailReader
+from .splitting import concat, split
 
 __all__ = [
-    'Reader', 'OrderedDictReader', 'Writer', 'DictWriter', 'to_text',
-    'to_bytes', 'to_str', 'from_str', 'text_from_dicts',
-    'ordereddicts_from_text', 'sniff_text'
+    'Reader', 'OrderedDictReader', 'NamedTupleReader', 'TypedReader',
+    'Writer', 'DictWriter', 'to_text', 'to_bytes', 'to_str', 'from_str',
+    'text_from_dicts', 'ordereddicts_from_text', 'sniff_text', 'sniff_file',
+    'sniff_stream', 'ParallelReader', 'ParallelWriter', 'ColumnReader',
+    'between', 'sort', 'aggregate', 'join', 'Change', 'diff',
+    'Checkpoint', 'TailReader', 'split', 'concat'
 ]
+
+if not six.PY2:
+    from .aio import AsyncReader, AsyncDictReader, AsyncWriter, \
+        AsyncDictWriter
+
+    __all__ += [
+        'AsyncReader', 'AsyncDictReader', 'AsyncWriter', 'AsyncDictWriter'
+    ]
@@ -0,0 +1,8 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,369 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+import csv
+import hashlib
+import heapq
+import math
+from operator import itemgetter
+import os
+import shutil
+import struct
+import tempfile
+
+import six
+from six.moves import cPickle as pickle
+
+from .conversion import converter
+from .csv import Reader
+from .sorting import reduce_runs
+
+PRECISION = 12
+
+
+class Count(object):
+    """Counts the rows in the group, or with a column, the non-empty values
+    in it.
+    """
+
+    default_type = 'text'
+
+    def __init__(self):
+        self.n = 0
+
+    def add(self, x):
+        self.n += 1
+
+    def merge(self, other):
+        self.n += other.n
+
+    def result(self):
+        return self.n
+
+
+class Sum(object):
+
+    default_type = 'float'
+
+    def __init__(self):
+        self.total = 0
+
+    def add(self, x):
+        self.total += x
+
+    def merge(self, other):
+        self.total += other.total
+
+    def result(self):
+        return self.total
+
+
+class Mean(object):
+
+    default_type = 'float'
+
+    def __init__(self):
+        self.total = 0
+        self.n = 0
+
+    def add(self, x):
+        self.total += x
+        self.n += 1
+
+    def merge(self, other):
+        self.total += other.total
+        self.n += other.n
+
+    def result(self):
+        return self.total / self.n if self.n else None
+
+
+class Min(object):
+
+    default_type = 'text'
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, x):
+        if self.value is None or x < self.value:
+            self.value = x
+
+    def merge(self, other):
+        if other.value is not None:
+            self.add(other.value)
+
+    def result(self):
+        return self.value
+
+
+class Max(Min):
+
+    def add(self, x):
+        if self.value is None or x > self.value:
+            self.value = x
+
+
+class Distinct(object):
+    """Counts distinct values exactly, by keeping them all.
+    """
+
+    default_type = 'text'
+
+    def __init__(self):
+        self.values = set()
+
+    def add(self, x):
+        self.values.add(x)
+
+    def merge(self, other):
+        self.values |= other.values
+
+    def result(self):
+        return len(self.values)
+
+
+class ApproxDistinct(object):
+    """Estimates the number of distinct values with a HyperLogLog sketch,
+    which takes a fixed 2 ** PRECISION bytes however many values there are
+    (4KB for an error of about 1.6%).
+    """
+
+    default_type = 'text'
+    p = PRECISION
+    m = 1 << PRECISION
+    width = 64 - PRECISION
+
+    def __init__(self):
+        self.registers = bytearray(self.m)
+
+    def add(self, x):
+        digest = hashlib.md5(six.text_type(x).encode('utf-8')).digest()
+        h = struct.unpack('<Q', digest[:8])[0]
+        rest = h & ((1 << self.width) - 1)
+        rank = self.width - rest.bit_length() + 1
+        i = h >> self.width
+
+        if rank > self.registers[i]:
+            self.registers[i] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(
+            max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def result(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(b'\0')
+
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+AGGREGATES = OrderedDict([
+    ('count', Count),
+    ('sum', Sum),
+    ('mean', Mean),
+    ('min', Min),
+    ('max', Max),
+    ('distinct', Distinct),
+    ('approx_distinct', ApproxDistinct),
+])
+
+
+def parse_aggregations(aggregations):
+    """Normalize the aggregations to a list of (output name, accumulator
+    class, column) tuples.
+    """
+    parsed = []
+
+    for name, spec in aggregations.items():
+        if isinstance(spec, six.string_types):
+            spec = (spec, None)
+        function, column = spec
+
+        if function not in AGGREGATES:
+            raise ValueError('unknown aggregate: {!r}'.format(function))
+        if column is None and function != 'count':
+            raise ValueError('{} needs a column'.format(function))
+        parsed.append((name, AGGREGATES[function], column))
+    return parsed
+
+
+def write_groups(groups, path):
+    """Write (key, accumulators) pairs out to a file, in the order given.
+    """
+    with open(path, 'wb') as f:
+        for group in groups:
+            pickle.dump(group, f, pickle.HIGHEST_PROTOCOL)
+
+
+def spill(groups, tmp, number):
+    """Write the groups out to a temporary file, sorted by key, and return
+    its path.
+    """
+    path = os.path.join(tmp, 'groups-{}.pickle'.format(number))
+    write_groups(((key, groups[key]) for key in sorted(groups)), path)
+    return path
+
+
+def read_spilled(path, run):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                key, accumulators = pickle.load(f)
+            except EOFError:
+                return
+            yield key, run, accumulators
+
+
+def merge_groups(runs):
+    """Merge the sorted runs of groups, combining the accumulators of
+    groups that were spilled more than once. The merged groups are sorted
+    by key too.
+    """
+    merged = heapq.merge(*[read_spilled(path, run)
+                           for run, path in enumerate(runs)])
+    current = None
+    combined = None
+
+    for key, run, accumulators in merged:
+        if key == current:
+            for a, b in zip(combined, accumulators):
+                a.merge(b)
+            continue
+
+        if combined is not None:
+            yield current, combined
+        current, combined = key, accumulators
+
+    if combined is not None:
+        yield current, combined
+
+
+def key_function(n):
+    """The group key of a row (with the group columns first), as a tuple.
+    Values missing from short rows are taken to be empty.
+    """
+    get = itemgetter(*range(n))
+
+    def key(row):
+        k = get(row)
+        if n == 1:
+            k = (k,)
+        if None in k:
+            k = tuple('' if x is None else x for x in k)
+        return k
+
+    return key
+
+
+def aggregate(f, by, aggregations, types=None, where=None, max_groups=None,
+              tmpdir=None, dialect=csv.excel, **kw):
+    """Group the rows of a csv file and compute aggregates over each group,
+    in one pass over the file. Only an accumulator per group and aggregate
+    is kept in memory, so memory use grows with the number of groups, not
+    the number of rows.
+
+    Args:
+        f: The file name or file object to read. It needs a header row.
+        by: The column (or list of columns) to group by.
+        aggregations: A mapping of output name to (function, column), where
+            function is one of 'count', 'sum', 'mean', 'min', 'max',
+            'distinct' (an exact count of distinct values) or
+            'approx_distinct' (an estimate using a HyperLogLog sketch, that
+            takes 4KB per group however many values there are). 'count' on
+            its own counts the rows in each group; with a column it counts
+            the non-empty values. Empty values are skipped by everything
+            else.
+        types: A mapping of column to type (as per TypedReader), which the
+            values are converted to before being aggregated. Sums and means
+            default to float, everything else works on the text.
+        where: Only aggregate rows matching these conditions (as for
+            Reader).
+        max_groups: If there are more groups than this, they are written
+            out to a temporary file (in `tmpdir`) and memory freed up; the
+            spilled groups are merged back together at the end (in passes,
+            if there are lots of files, as for csvx.sort).
+        dialect, kw: As for Reader.
+
+    Yields an OrderedDict per group, with the group columns followed by the
+    aggregates. Groups come in the order they were first seen, unless they
+    were spilled, in which case they're sorted by the group columns.
+    """
+    if not isinstance(by, (list, tuple)):
+        by = [by]
+    types = types or {}
+    aggregates = parse_aggregations(aggregations)
+
+    columns = list(by)
+    for name, accumulator, column in aggregates:
+        if column is not None and column not in columns:
+            columns.append(column)
+
+    getters = []
+    for name, accumulator, column in aggregates:
+        if column is None:
+            getters.append((None, None))
+        else:
+            convert = converter(types.get(column, accumulator.default_type))
+            getters.append((columns.index(column), convert))
+
+    factories = [accumulator for name, accumulator, column in aggregates]
+    group_key = key_function(len(by))
+
+    groups = OrderedDict()
+    runs = []
+    tmp = None
+
+    try:
+        with Reader(f, dialect, columns=columns, where=where, **kw) as r:
+            next(r, None)
+
+            for row in r:
+                if not row:
+                    continue
+
+                key = group_key(row)
+                accumulators = groups.get(key)
+
+                if accumulators is None:
+                    if max_groups is not None and len(groups) >= max_groups:
+                        if tmp is None:
+                            tmp = tempfile.mkdtemp(prefix='csvx-groups-',
+                                                   dir=tmpdir)
+                        runs.append(spill(groups, tmp, len(runs)))
+                        groups = OrderedDict()
+
+                    accumulators = groups[key] = [a() for a in factories]
+
+                for a, (i, convert) in zip(accumulators, getters):
+                    if i is None:
+                        a.add(None)
+                        continue
+
+                    x = row[i]
+                    if x is None or x == '':
+                        continue
+                    a.add(convert(x) if convert is not None else x)
+
+        if runs:
+            runs.append(spill(groups, tmp, len(runs)))
+            runs = reduce_runs(runs, merge_groups, write_groups, tmp)
+            groups = merge_groups(runs)
+        else:
+            groups = six.iteritems(groups)
+
+        names = [name for name, accumulator, column in aggregates]
+
+        for key, accumulators in groups:
+            result = OrderedDict(zip(by, key))
+            result.update(zip(names, [a.result() for a in accumulators]))
+            yield result
+
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,254 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+# Asyncio versions of the readers and writers. Python 3 only, so this is
+# only imported by the package on python 3.
+
+import codecs
+import csv
+import inspect
+import io
+
+from .csv import OrderedDictReader, text_row, dict_to_row, to_text, \
+    chunks, WRITE_BATCH_SIZE
+from .records import RecordSplitter, dialect_params, quote_character
+
+READ_SIZE = 64 * 1024
+
+
+async def maybe_await(x):
+    if inspect.isawaitable(x):
+        return await x
+    return x
+
+
+async def close_stream(stream):
+    close = getattr(stream, 'close', None)
+
+    if close is not None:
+        await maybe_await(close())
+
+    wait_closed = getattr(stream, 'wait_closed', None)
+
+    if wait_closed is not None:
+        await wait_closed()
+
+
+class AsyncReader(object):
+    """An async context manager that reads csv from an async byte stream,
+    iterating over the rows in one-list-per-row fashion with `async for`.
+
+    The stream can be anything with an async `read(n)` method that returns
+    bytes (and empty bytes at the end), like an asyncio.StreamReader or an
+    aiohttp response body. Data is read from the stream only as rows are
+    needed, `read_size` bytes at a time, so memory use stays bounded
+    however big the input is.
+
+    Records are parsed once they're complete. Quote characters are counted
+    to tell whether a newline ends a record, so newlines inside quoted
+    fields are fine as long as quotes are escaped by doubling them (as they
+    are in the default dialect). As with Reader, newlines inside quoted
+    fields are kept as they are ('\r\n' stays '\r\n'). Line endings of
+    just '\r' aren't supported.
+
+    Args:
+        stream: The async byte stream.
+        dialect, kw: As for Reader.
+        encoding: The encoding of the stream.
+        read_size: How many bytes to ask the stream for at a time.
+    """
+
+    def __init__(self, stream, dialect=csv.excel, encoding='utf-8',
+                 read_size=READ_SIZE, **kw):
+        self.stream = stream
+        self.dialect = dialect
+        self.kw = kw
+        self.read_size = read_size
+
+        self.params = dialect_params(dialect, kw)
+        self.splitter = RecordSplitter(quote_character(self.params), '\n')
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+
+        self.rows = iter([])
+        self.finished = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        await self.close()
+
+    async def close(self):
+        await close_stream(self.stream)
+
+    async def fill(self):
+        while not self.finished:
+            data = await self.stream.read(self.read_size)
+
+            if data:
+                records = self.splitter.split(self.decoder.decode(data))
+            else:
+                self.finished = True
+                records = self.splitter.split(self.decoder.decode(b'', True))
+
+                if self.splitter.pending:
+                    records.append(self.splitter.pending)
+
+            if records:
+                self.rows = csv.reader(records, **self.params)
+                return
+
+    async def next(self):
+        while True:
+            try:
+                return list(next(self.rows))
+            except StopIteration:
+                if self.finished:
+                    raise StopAsyncIteration
+                await self.fill()
+
+    __anext__ = next
+
+    def __aiter__(self):
+        return self
+
+
+class AsyncDictReader(AsyncReader):
+    """Same as AsyncReader, but rows are OrderedDicts, as per
+    OrderedDictReader. The field names are read from the first row when
+    you first iterate, or you can pass them in as `fieldnames` (and also
+    `restkey` and `restval`, which work as they do for OrderedDictReader).
+    """
+
+    def __init__(self, stream, dialect=csv.excel, fieldnames=None,
+                 restkey=None, restval=None, **kw):
+        super(AsyncDictReader, self).__init__(stream, dialect, **kw)
+        self.fieldnames = fieldnames
+        self.restkey = restkey
+        self.restval = restval
+
+    make_row = OrderedDictReader.make_row
+
+    async def read_fieldnames(self):
+        """Read the header row, if it hasn't been read already. Returns the
+        field names.
+        """
+        if self.fieldnames is None:
+            try:
+                self.fieldnames = await AsyncReader.next(self)
+            except StopAsyncIteration:
+                self.fieldnames = []
+        return self.fieldnames
+
+    async def next(self):
+        await self.read_fieldnames()
+        row = await AsyncReader.next(self)
+
+        while not row:
+            row = await AsyncReader.next(self)
+        return self.make_row(row)
+
+    __anext__ = next
+
+
+class AsyncWriter(object):
+    """An async context manager that writes rows to an async byte stream.
+
+    The stream needs a `write` method taking bytes, which can be either a
+    coroutine or a plain method. If the stream also has a `drain` coroutine
+    (as an asyncio.StreamWriter does), it's awaited after every write, so
+    that a slow reader at the other end holds up the writer rather than
+    letting the unsent data pile up in memory.
+
+    Args:
+        stream: The async byte stream.
+        dialect, kw: As for Writer.
+        encoding: The encoding to write with.
+    """
+
+    def __init__(self, stream, dialect=csv.excel, encoding='utf-8', **kw):
+        self.stream = stream
+        self.dialect = dialect
+        self.kw = kw
+        self.encoding = encoding
+        self.row_count = 0
+
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, dialect=dialect, **kw)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        await self.close()
+
+    async def close(self):
+        await close_stream(self.stream)
+
+    async def flush_buffer(self):
+        data = self.buffer.getvalue().encode(self.encoding)
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+
+        await maybe_await(self.stream.write(data))
+
+        drain = getattr(self.stream, 'drain', None)
+
+        if drain is not None:
+            await drain()
+
+    async def write_row(self, row):
+        """Write a row, as per Writer.write_row.
+        """
+        self.writer.writerow(text_row(row))
+        self.row_count += 1
+        await self.flush_buffer()
+
+    async def write_rows(self, rows, batch_size=WRITE_BATCH_SIZE):
+        """Write multiple rows, as per Writer.write_rows. Each batch of rows
+        goes to the stream in a single write.
+        """
+        for chunk in chunks(rows, batch_size):
+            self.writer.writerows([text_row(row) for row in chunk])
+            self.row_count += len(chunk)
+            await self.flush_buffer()
+
+
+class AsyncDictWriter(AsyncWriter):
+    """Same as AsyncWriter, but rows are dictionaries, as per DictWriter.
+    The header is written along with the first row.
+    """
+
+    def __init__(self, stream, fieldnames=None, restval='',
+                 extrasaction='raise', **kw):
+        super(AsyncDictWriter, self).__init__(stream, **kw)
+        self.fieldnames = fieldnames
+        self.restval = restval
+        self.extrasaction = extrasaction
+        self.row_from_dict = None
+
+    def dict_row(self, d):
+        if self.row_from_dict is None:
+            if self.fieldnames is None:
+                self.fieldnames = d.keys()
+            self.fieldnames = [to_text(fn) for fn in self.fieldnames]
+
+            self.row_from_dict = dict_to_row(self.fieldnames, self.restval,
+                                             self.extrasaction)
+            self.writer.writerow(self.fieldnames)
+        return self.row_from_dict(d)
+
+    async def write_dict(self, d):
+        """Write a row, as per DictWriter.write_dict.
+        """
+        self.writer.writerow(self.dict_row(d))
+        self.row_count += 1
+        await self.flush_buffer()
+
+    async def write_dicts(self, rows, batch_size=WRITE_BATCH_SIZE):
+        """Write multiple rows, as per DictWriter.write_dicts.
+        """
+        for chunk in chunks(rows, batch_size):
+            self.writer.writerows([self.dict_row(d) for d in chunk])
+            self.row_count += len(chunk)
+            await self.flush_buffer()
@@ -0,0 +1,101 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import threading
+
+from six.moves import queue
+
+BUFFER_SIZE = 4 * 1024 * 1024
+QUEUE_LENGTH = 2
+
+
+class BufferedOutput(object):
+    """Wraps a text file so that writes are collected in memory and passed
+    on to it in big blocks, of at least `buffer_size` characters. That
+    makes a big difference on network filesystems and the like, where
+    every write is expensive.
+
+    With background=True, the blocks are written by a separate thread, so
+    the next block can be put together while the last one is being
+    written. At most QUEUE_LENGTH blocks wait to be written at once. An
+    error in the writing thread is raised by the next write, flush or
+    close.
+    """
+
+    def __init__(self, f, buffer_size=BUFFER_SIZE, background=False):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.size = 0
+        self.error = None
+        self.thread = None
+
+        if background:
+            self.queue = queue.Queue(QUEUE_LENGTH)
+            self.thread = threading.Thread(target=self.write_blocks)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def write_blocks(self):
+        while True:
+            block = self.queue.get()
+
+            try:
+                if block is None:
+                    return
+                if self.error is None:
+                    self.f.write(block)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def write(self, s):
+        self.check()
+        self.parts.append(s)
+        self.size += len(s)
+
+        if self.size >= self.buffer_size:
+            self.drain()
+        return len(s)
+
+    def drain(self):
+        self.check()
+
+        if not self.parts:
+            return
+
+        block = ''.join(self.parts)
+        self.parts = []
+        self.size = 0
+
+        if self.thread is None:
+            self.f.write(block)
+        else:
+            self.queue.put(block)
+
+    def flush(self):
+        self.drain()
+
+        if self.thread is not None:
+            self.queue.join()
+            self.check()
+        self.f.flush()
+
+    @property
+    def closed(self):
+        return self.f.closed
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self.thread is not None and self.thread.is_alive():
+                self.queue.put(None)
+                self.thread.join()
+            self.f.close()
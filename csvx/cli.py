@@ -0,0 +1,64 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import sys
+
+from .csv import Writer
+from .diffing import STRATEGIES, diff
+from .joins import MEMORY
+
+
+def parser():
+    p = argparse.ArgumentParser(prog='csvx', description='csvx: painless csv')
+    commands = p.add_subparsers(dest='command')
+    commands.required = True
+
+    d = commands.add_parser(
+        'diff', help='show the rows that changed between two csv files',
+        description='Compare two csv files by a key column, and write the '
+        'differences out as csv: a line for each added or removed row, and '
+        'a line for each changed value of a changed row. Exits with status '
+        '1 if there are differences.')
+    d.add_argument('old')
+    d.add_argument('new')
+    d.add_argument('-k', '--key', action='append', required=True,
+                   help='key column (repeat for more than one)')
+    d.add_argument('--strategy', choices=STRATEGIES, default='auto')
+    d.add_argument('--memory', type=int, default=MEMORY,
+                   help='bytes of the old file to hold in memory')
+    return p
+
+
+def diff_command(args, out):
+    w = Writer(out)
+    w.write_row(['change'] + args.key + ['column', 'old', 'new'])
+    found = False
+
+    for change in diff(args.old, args.new, key=args.key,
+                       strategy=args.strategy, memory=args.memory):
+        found = True
+        key = list(change.key) if len(args.key) > 1 else [change.key]
+
+        if change.kind == 'changed':
+            for column, (a, b) in change.changes.items():
+                w.write_row([change.kind] + key + [column, a, b])
+        else:
+            w.write_row([change.kind] + key + ['', '', ''])
+
+    w.flush()
+    return 1 if found else 0
+
+
+def main(argv=None, out=None):
+    args = parser().parse_args(argv)
+
+    if out is None:
+        out = sys.stdout
+
+    if args.command == 'diff':
+        return diff_command(args, out)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
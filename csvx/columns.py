@@ -0,0 +1,177 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from array import array
+from collections import OrderedDict
+import csv
+from itertools import chain
+
+from .conversion import converter, infer_types, type_name
+from .csv import Reader, chunks
+
+BATCH_SIZE = 10000
+
+try:
+    array('q')
+    INT_TYPECODE = 'q'
+except ValueError:  # pragma: no cover
+    INT_TYPECODE = 'l'
+
+
+def parse_float(x):
+    if x == '':
+        return float('nan')
+    return float(x)
+
+
+TYPECODES = {
+    'int': (INT_TYPECODE, int),
+    'float': ('d', parse_float),
+}
+
+
+def bad_value(column, parse, values, error):
+    """Find the first of some values that can't be parsed and stored in a
+    column. Returns its position (counting from 1) and the error, or 0 and
+    the original error if it can't be found.
+    """
+    for n, x in enumerate(values, 1):
+        try:
+            value = parse(x)
+
+            if isinstance(column, array):
+                array(column.typecode, [value])
+        except (ValueError, TypeError, OverflowError) as e:
+            return n, e
+    return 0, error
+
+
+class ColumnReader(object):
+    """A context manager that reads a csv file into columns, rather than
+    rows. Numeric columns are stored in compact arrays (from the stdlib
+    array module), everything else in lists.
+
+    Only the columns you ask for are kept, so pulling a few columns out of
+    a wide file needs memory for those columns alone. Rows are read and
+    converted in batches.
+
+    Args:
+        f (filename or file-like object): As for Reader.
+        columns: The names of the columns to read. Defaults to all of them.
+        types: A mapping of column name to type, as for TypedReader. Int
+            and float columns are stored as numeric arrays: empty values
+            become nan in float columns, and are an error in int columns
+            (as are values too big for a 64 bit integer). Errors name the
+            column and the row (counting rows after the header from 1).
+            Columns of other types are converted and stored in lists. Pass
+            'infer' to infer the types from the first batch of rows; an
+            integer column with empty values in that batch is read as
+            float, so the blanks can be stored as nan.
+        batch_size: The number of rows to read before converting them into
+            columns.
+        dialect, kw: As for Reader.
+    """
+
+    def __init__(self, f, columns=None, types=None, batch_size=BATCH_SIZE,
+                 dialect=csv.excel, **kw):
+        self.reader = Reader(f, dialect, **kw)
+        self.fieldnames = next(self.reader, [])
+        self.batch_size = batch_size
+
+        if columns is None:
+            columns = self.fieldnames
+        self.columns = list(columns)
+
+        missing = [c for c in self.columns if c not in self.fieldnames]
+        if missing:
+            raise KeyError('no such columns: {}'.format(missing))
+
+        self.indexes = [self.fieldnames.index(c) for c in self.columns]
+
+        if types == 'infer':
+            self.types = None
+        else:
+            self.types = dict((k, type_name(t))
+                              for k, t in (types or {}).items())
+
+            unknown = set(self.types) - set(self.columns)
+            if unknown:
+                raise KeyError('types given for columns not being read: '
+                               '{}'.format(sorted(unknown)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def close(self):
+        self.reader.close()
+
+    def empty_column(self, name):
+        t = self.types.get(name, 'text')
+
+        if t in TYPECODES:
+            typecode, parse = TYPECODES[t]
+            return array(typecode), parse
+        return list(), converter(t)
+
+    def read(self, numpy=False):
+        """Read the rest of the file. Returns an OrderedDict of column name
+        to column.
+
+        If numpy is True, numeric columns are returned as numpy arrays
+        instead (sharing memory with the stdlib arrays, so there's no
+        copy). This needs numpy to be installed.
+        """
+        if numpy:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError('numpy is needed for numpy=True')
+
+        rows = (row for row in self.reader if row)  # skip blank lines
+        batches = chunks(rows, self.batch_size)
+
+        if self.types is None:
+            first = next(batches, [])
+            self.types = infer_types(self.fieldnames, first)
+            batches = chain([first], batches)
+
+            for i, name in zip(self.indexes, self.columns):
+                if self.types[name] == 'int' and any(
+                        i >= len(row) or row[i] == '' for row in first):
+                    self.types[name] = 'float'
+
+        storage = [self.empty_column(name) for name in self.columns]
+        columns = list(zip(self.indexes, storage))
+        row_count = 0
+
+        for batch in batches:
+            for i, (column, parse) in columns:
+                try:
+                    values = [row[i] for row in batch]
+                except IndexError:
+                    values = [row[i] if i < len(row) else ''
+                              for row in batch]
+
+                if parse is None:
+                    column.extend(values)
+                    continue
+
+                try:
+                    column.extend(map(parse, values))
+                except (ValueError, TypeError, OverflowError) as e:
+                    n, e = bad_value(column, parse, values, e)
+                    raise ValueError('column {!r}, row {}: {}'.format(
+                        self.fieldnames[i], row_count + n, e))
+
+            row_count += len(batch)
+
+        result = OrderedDict()
+
+        for name, (column, parse) in zip(self.columns, storage):
+            if numpy and isinstance(column, array):
+                column = np.frombuffer(column, dtype=column.typecode)
+            result[name] = column
+        return result
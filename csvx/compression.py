@@ -0,0 +1,176 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import bz2
+import gzip
+import io
+import os
+
+import six
+
+BUFFER_SIZE = 1024 * 1024
+
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+MAGIC = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
+COMPRESSIONS = frozenset(EXTENSIONS.values())
+
+
+def is_path(f):
+    return isinstance(f, (six.text_type, six.binary_type)) or \
+        hasattr(f, '__fspath__')
+
+
+def detect_compression(path, reading=True):
+    """Work out how a file is compressed, from its extension or (when
+    reading) from the first few bytes of the file. Returns the name of the
+    compression, or None for a plain file.
+    """
+    name = to_native_path(path)
+    ext = os.path.splitext(name)[1].lower()
+
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+
+    if reading:
+        try:
+            with io.open(name, 'rb') as f:
+                start = f.read(6)
+        except (IOError, OSError):
+            return None  # let the real open raise a sensible error
+
+        for magic, compression in MAGIC:
+            if start.startswith(magic):
+                return compression
+    return None
+
+
+def to_native_path(path):
+    if hasattr(path, '__fspath__'):
+        path = path.__fspath__()
+
+    if isinstance(path, six.binary_type):
+        path = path.decode('utf-8')
+    return path
+
+
+class RawStream(io.RawIOBase):
+    """Gives a file object that only has read and write (like the Python 2
+    BZ2File) the interface the io buffers need.
+    """
+
+    def __init__(self, f, mode):
+        self.f = f
+        self.mode = mode
+
+    def readable(self):
+        return 'r' in self.mode
+
+    def writable(self):
+        return 'w' in self.mode
+
+    def readinto(self, b):
+        data = self.f.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def write(self, b):
+        self.f.write(memoryview(b).tobytes())
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self.f.close()
+        super(RawStream, self).close()
+
+
+def open_binary(path, mode, compression, compresslevel=None, threads=None):
+    if compression == 'gzip':
+        level = 9 if compresslevel is None else compresslevel
+        return gzip.GzipFile(path, mode, compresslevel=level)
+
+    if compression == 'bz2':
+        level = 9 if compresslevel is None else compresslevel
+        f = bz2.BZ2File(path, mode, compresslevel=level)
+        return RawStream(f, mode) if six.PY2 else f
+
+    if compression == 'xz':
+        try:
+            import lzma
+        except ImportError:  # pragma: no cover
+            try:
+                from backports import lzma
+            except ImportError:
+                raise ImportError('xz compression needs the lzma module '
+                                  '(backports.lzma on Python 2)')
+
+        if mode == 'rb':
+            return lzma.LZMAFile(path, mode)
+        return lzma.LZMAFile(path, mode, preset=compresslevel)
+
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstd compression needs the zstandard package')
+
+        raw = io.open(path, mode)
+
+        if mode == 'rb':
+            d = zstandard.ZstdDecompressor()
+
+            try:
+                # otherwise only the first frame of the file is read
+                return d.stream_reader(raw, read_across_frames=True)
+            except TypeError:
+                raw.close()
+                raise ImportError('reading zstd files needs version 0.15 or '
+                                  'later of the zstandard package')
+
+        level = 3 if compresslevel is None else compresslevel
+        threads = -1 if threads is None else threads
+        c = zstandard.ZstdCompressor(level=level, threads=threads)
+        return c.stream_writer(raw)
+
+    raise ValueError('unknown compression: {!r}'.format(compression))
+
+
+def open_compressed(path, mode='r', compression=None, compresslevel=None,
+                    encoding=None, threads=None):
+    """Open a compressed file in text mode, decompressing (or compressing)
+    as it's read (or written), through a large buffer. Newlines are left
+    alone (newline=''), as the csv module expects.
+
+    Args:
+        path: The file name.
+        mode: 'r' or 'w'.
+        compression: One of 'gzip', 'bz2', 'xz' or 'zstd' (which needs the
+            zstandard package).
+        compresslevel: The compression level to write with. Defaults to
+            the codec's own default.
+        encoding: The text encoding. Defaults to the same as io.open.
+        threads: How many threads to compress with, for codecs that can
+            use more than one (zstd). Defaults to one per CPU.
+    """
+    path = to_native_path(path)
+    binary = open_binary(path, mode + 'b', compression, compresslevel,
+                         threads)
+
+    if mode == 'r':
+        buffered = io.BufferedReader(binary, BUFFER_SIZE)
+    else:
+        buffered = io.BufferedWriter(binary, BUFFER_SIZE)
+    return io.TextIOWrapper(buffered, encoding=encoding, newline='')
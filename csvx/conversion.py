@@ -0,0 +1,131 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+from datetime import date, datetime
+
+TRUE_VALUES = frozenset(['true', 't', 'yes', 'y'])
+FALSE_VALUES = frozenset(['false', 'f', 'no', 'n'])
+
+DATETIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+]
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def parse_bool(x):
+    lowered = x.lower()
+
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError('not a boolean: {!r}'.format(x))
+
+
+def parse_datetime(x):
+    for f in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(x, f)
+        except ValueError:
+            pass
+    raise ValueError('not a datetime: {!r}'.format(x))
+
+
+def parse_date(x):
+    return datetime.strptime(x, DATE_FORMAT).date()
+
+
+# In order of preference: when inferring, a column gets the first of these
+# that can parse every value in the sample.
+PARSERS = OrderedDict([
+    ('int', int),
+    ('float', float),
+    ('bool', parse_bool),
+    ('datetime', parse_datetime),
+    ('date', parse_date),
+    ('text', None),
+])
+
+TYPES = list(PARSERS)
+
+
+def type_name(t):
+    """Accept either the name of a type or the python type itself (int,
+    float, bool...), and return the name.
+    """
+    for name, parse in PARSERS.items():
+        if t == name or t is parse:
+            return name
+
+    if t in (bool, datetime, date):
+        return t.__name__
+    if t in (str, type(''), None):
+        return 'text'
+    raise ValueError('unknown type: {!r}'.format(t))
+
+
+def converter(t):
+    """Return a function that converts text values to the given type. Empty
+    values become None, except in text columns, which are left as they
+    are.
+    """
+    name = type_name(t)
+    parse = PARSERS[name]
+
+    if parse is None:
+        return None
+
+    def convert(x):
+        if x == '' or x is None:
+            return None
+        return parse(x)
+
+    return convert
+
+
+def infer_type(values):
+    """Work out the type of a column, given some sample values from it.
+    Returns the name of the type (one of TYPES). Empty values are ignored.
+    """
+    candidates = [(name, parse) for name, parse in PARSERS.items()
+                  if parse is not None]
+
+    for x in values:
+        if x == '' or x is None:
+            continue
+
+        remaining = []
+
+        for name, parse in candidates:
+            try:
+                parse(x)
+            except (ValueError, TypeError, OverflowError):
+                continue
+            remaining.append((name, parse))
+
+        candidates = remaining
+
+        if not candidates:
+            return 'text'
+
+    if len(candidates) == len(PARSERS) - 1:  # nothing but empty values
+        return 'text'
+    return candidates[0][0]
+
+
+def infer_types(fieldnames, rows):
+    """Infer the type of each column, given the field names and a sample of
+    rows (as lists). Returns an OrderedDict of field name to type name.
+    """
+    rows = list(rows)
+    types = OrderedDict()
+
+    for i, name in enumerate(fieldnames):
+        values = (row[i] for row in rows if i < len(row))
+        types[name] = infer_type(values)
+    return types
@@ -1,11 +1,32 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import codecs
 import csv
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import io
+from itertools import chain, islice
 
 import six
+from six.moves import filter, map, range, zip_longest
+
+from .buffering import BUFFER_SIZE, BufferedOutput
+from .compression import is_path, detect_compression, open_compressed
+from .conversion import converter, infer_types, type_name
+from .index import EVERY, load_or_build_index
+from .records import ascii_compatible, dialect_params, quote_character
+from .selection import column_indexes, projection, compile_where
+
+SAMPLE_SIZE = 1000
+SNIFF_SIZE = 64 * 1024
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
 
 if not six.PY2:
     unicode = str  # pragma: no cover
@@ -36,6 +57,32 @@ def to_bytes(x):  # pragma: no cover
         return unicode(x).encode('utf-8')
 
 
+def text_row(row):
+    """Convert a row to a sequence of text values, ready for the stdlib
+    writer. Rows that are already all text are returned as-is, without
+    building a new list.
+    """
+    if type(row) is not list and type(row) is not tuple:
+        row = list(row)
+
+    for s in row:
+        if type(s) is not unicode:
+            return list(map(to_text, row))
+    return row
+
+
+def chunks(iterable, size):
+    """Split an iterable into lists of at most `size` items.
+    """
+    it = iter(iterable)
+
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 if not six.PY2:
     to_str = to_text  # pragma: no cover
     from_str = to_bytes  # pragma: no cover
@@ -44,54 +91,297 @@ else:
     from_str = to_text  # pragma: no cover
 
 
-def smart_open(f):
-    try:
-        return io.open(f)
-    except TypeError:
-        return f
+def smart_open(f, encoding=None, compression='infer'):
+    if compression == 'infer':
+        compression = detect_compression(f) if is_path(f) else None
 
+    if compression:
+        return open_compressed(f, 'r', compression, encoding=encoding)
 
-def smart_openw(f):
     try:
-        return io.open(f, 'w')
+        return io.open(f, encoding=encoding, newline='')
     except TypeError:
         return f
 
 
+def is_binary(f):
+    if isinstance(f, (io.BufferedIOBase, io.RawIOBase)):
+        return True
+    return 'b' in getattr(f, 'mode', '')
+
+
+def smart_openw(f, compression='infer', compresslevel=None,
+                buffer_size=None, background=False, encoding=None):
+    if compression == 'infer':
+        compression = detect_compression(f, False) if is_path(f) else None
+
+    if compression:
+        f = open_compressed(f, 'w', compression, compresslevel,
+                            encoding=encoding)
+    else:
+        try:
+            f = io.open(f, 'w', encoding=encoding)
+        except TypeError:
+            pass
+
+    if buffer_size or background:
+        f = BufferedOutput(f, buffer_size or BUFFER_SIZE, background)
+    return f
+
+
+WRITE_BATCH_SIZE = 1000
+
 if six.PY2:
-    from .python2 import TextReader, TextDictReader, \
-                        TextWriter, TextDictWriter
+    from .python2 import TextReader, TextWriter
     writer = TextWriter
     reader = TextReader
-    dictreader = TextDictReader
-    dictwriter = TextDictWriter
 else:
     writer = csv.writer
     reader = csv.reader
-    dictreader = csv.DictReader
-    dictwriter = csv.DictWriter
 
 
-class Reader(object):
+def binary_reader(f, encoding='utf-8', dialect=csv.excel, **kw):
+    """A csv reader over a binary stream in the given encoding, giving rows
+    as lists of text.
+    """
+    if six.PY2:
+        return TextReader(f, dialect, encoding=encoding, **kw)
+    text = io.TextIOWrapper(f, encoding=encoding, newline='')
+    return csv.reader(text, dialect, **kw)
+
+
+def open_rows(f, dialect=csv.excel, encoding=None, compression='infer',
+              **kw):
+    """Open f (if it's a file name) and return it, along with a csv reader
+    over it that gives rows as lists of text.
+
+    Binary file objects are read in `encoding` (utf-8 by default). On
+    Python 2, files opened here are parsed as bytes and each field decoded
+    once, rather than decoding the file, encoding it back to utf-8 for the
+    csv module and then decoding every field again.
+    """
+    encoding = encoding or getattr(dialect, 'encoding', None)
+    opened = is_path(f)
+    f = smart_open(f, encoding, compression)
+
+    if is_binary(f):
+        return f, binary_reader(f, encoding or 'utf-8', dialect, **kw)
+
+    if six.PY2 and opened and hasattr(f, 'buffer') and \
+            ascii_compatible(f.encoding):
+        lines = iter(f.buffer.readline, b'')
+        return f, TextReader(lines, dialect, encoding=f.encoding, **kw)
+    return f, reader(f, dialect, **kw)
+
+
+def batches(rows, size, columnar=False, reuse=False, missing=None):
+    buffer = []
+
+    while True:
+        if reuse:
+            buffer[:] = islice(rows, size)
+            batch = buffer
+        else:
+            batch = list(islice(rows, size))
+
+        if not batch:
+            return
+
+        if columnar:
+            batch = [list(column)
+                     for column in zip_longest(*batch, fillvalue=missing)]
+        yield batch
+
+
+class RowAccess(object):
+    """Random access to the rows of a csv file, using a sidecar index (see
+    csvx.index). Used by Reader and OrderedDictReader when they're created
+    with index=True.
+    """
+
+    first_row = 0  # the number of records before row 0 (ie a header)
+
+    def init_index(self, f, index, compression, encoding=None):
+        self.index = None
+        self.index_every = None
+        self.path = None
+
+        if not index:
+            return
+
+        if not is_path(f):
+            raise TypeError('index=True needs a file name')
+
+        if compression not in ('infer', None) or \
+                (compression == 'infer' and detect_compression(f)):
+            raise ValueError('index=True needs a plain, uncompressed file')
+
+        # the index is built by scanning the raw bytes for newlines and
+        # quotes, which only works if they're the same bytes as in ascii
+        encoding = encoding or getattr(self.dialect, 'encoding', None)
+
+        if encoding and not ascii_compatible(encoding):
+            raise ValueError('index=True needs an ascii-compatible encoding, '
+                             'not {!r}'.format(encoding))
+
+        self.path = f
+        self.index_every = EVERY if index is True else index
+
+    def row_index(self):
+        """The RowIndex for the file, loaded from the sidecar file, or
+        built and saved if that's missing or out of date.
+        """
+        if self.path is None:
+            raise TypeError('random access needs index=True')
+
+        if self.index is None:
+            quotechar = quote_character(dialect_params(self.dialect, self.kw))
+
+            if quotechar:
+                quotechar = to_bytes(quotechar)
+            self.index = load_or_build_index(self.path, self.index_every,
+                                             quotechar)
+        return self.index
+
+    def count_rows(self):
+        """The number of rows in the file (after the header, for the dict
+        readers), from the index. This isn't __len__, because list() and
+        friends call that as a hint, which would build an index for every
+        file read that way.
+        """
+        return len(self.row_index()) - self.first_row
+
+    def seek_row(self, n):
+        """Jump to row n (counting from 0, and from the end if negative),
+        so that it's the next row returned. Only the rows since the nearest
+        indexed position are read to get there. Row numbers count all the
+        non-blank rows in the file, regardless of `where`.
+        """
+        if n < 0:
+            n += self.count_rows()
+
+        offset, skip = self.row_index().locate(n + self.first_row)
+        self.f.seek(offset)
+
+        while skip:
+            if next(self.raw):
+                skip -= 1
+        self.reader = self.pipeline(self.raw)
+
+    def __getitem__(self, key):
+        """reader[n] and reader[a:b:step] (the step can be negative). As
+        with seek_row, positions are rows of the file: with `where`,
+        reader[n] is the first matching row from row n on, and a slice
+        gives the rows it covers that match, rather than counting matches.
+        """
+        if isinstance(key, slice):
+            positions = range(*key.indices(self.count_rows()))
+
+            if not positions:
+                return []
+
+            first = min(positions[0], positions[-1])
+            last = max(positions[0], positions[-1])
+            self.seek_row(first)
+
+            raw = list(islice(filter(None, self.raw), last - first + 1))
+            raw = raw[positions[0] - first::key.step or 1]
+            self.reader = self.pipeline(iter(raw))
+            rows = list(self)
+            self.reader = self.pipeline(self.raw)
+            return rows
+
+        self.seek_row(key)
+        return next(self)
+
+
+class Reader(RowAccess):
     """A context manager that helps you read a csv file by iterating over the
     rows in one-list-per-row fashion.
 
     Args:
         f (filename or file-like object): The path of the file, or an already
             opened file. The file should be opened in text mode (using
-            io.open(... is always a good idea).
+            io.open(... is always a good idea), or in binary mode along
+            with an encoding.
         dialect: Dialect of the csv file. Defaults to csv.excel from the stdlib
             which should be usually what you want.
         kw (kwargs): Additional arguments, passed through to the constructor of
             the stdlib reader object used under the hood.
+        compression: If f is a file name, how the file is compressed: one
+            of 'gzip', 'bz2', 'xz' or 'zstd' (the last needs the zstandard
+            package), or None for an uncompressed file. The default,
+            'infer', works it out from the file extension (.gz, .bz2, .xz,
+            .zst) or failing that, the first few bytes of the file.
+            Compressed files are decompressed as they're read.
+        index: Allow random access to the rows, with reader.count_rows(),
+            slicing (reader[a:b]), reader[n] and reader.seek_row(n). These
+            use a sidecar index file, which is built (with a full scan of
+            the file) the first time it's needed, and rebuilt if the file
+            changes. If the index can't be saved (in a read-only directory,
+            say), it's kept in memory instead. Pass a number instead of
+            True to index every that many rows (the default is 1000). Needs
+            a plain, uncompressed file given by name, in an ascii-compatible
+            encoding (not utf-16, for instance). Blank lines aren't counted
+            as rows.
+            Positions are always rows of the file, even with `where` (see
+            RowAccess.__getitem__).
+        columns: Only return these columns (in this order), given by name
+            (as per the first row) or by position (negative positions
+            count back from the end of the first row). The column names are
+            looked up once and each row is then cut down with a single
+            itemgetter call. Rows too short to have some of the columns get
+            None for those.
+        where: Only return rows that match these conditions: a mapping of
+            column (name or position) to a value, a set of values, a
+            compiled regular expression or a function (see
+            csvx.selection.compile_where for the details, and
+            csvx.between for ranges). Conditions are compiled once and
+            checked against the raw fields of each row, before anything
+            else is done with it. The first row (the header) is always
+            returned.
+
+        encoding: The encoding of the file, if f is a file name or a file
+            opened in binary mode. Defaults to the dialect's `encoding`
+            attribute if it has one (as the ones returned by sniff_file
+            do), and otherwise to utf-8 for binary files, and the usual
+            default of io.open for file names.
     """
 
-    def __init__(self, f, dialect=csv.excel, **kw):
+    def __init__(self, f, dialect=csv.excel, compression='infer',
+                 columns=None, where=None, index=False, encoding=None, **kw):
         self.f = f
         self.dialect = dialect
         self.kw = kw
-        self.f = smart_open(self.f)
-        self.reader = reader(self.f, self.dialect, **self.kw)
+        self.init_index(f, index, compression, encoding)
+        self.f, self.raw = open_rows(f, dialect, encoding, compression,
+                                     **kw)
+        self.reader = self.raw
+
+        self.predicate = None
+        self.project = None
+
+        if columns is not None or where is not None:
+            header = list(next(self.raw, []))
+
+            if where is not None:
+                self.predicate = compile_where(where, header)
+
+            if columns is not None:
+                self.project = projection(column_indexes(columns, header))
+
+            self.reader = self.pipeline(self.raw, header)
+
+    def pipeline(self, rows, header=None):
+        if self.predicate is not None:
+            rows = filter(self.predicate, rows)
+
+        if header:
+            rows = chain([header], rows)
+
+        if self.project is not None:
+            rows = map(self.project, rows)
+        return rows
 
     def __enter__(self):
         return self
@@ -105,29 +395,85 @@ class Reader(object):
     def next(self):
         return list(next(self.reader))
 
+    def iter_batches(self, size, columnar=False, reuse=False):
+        """Iterate over the rows in batches of (up to) `size` rows at a time,
+        which saves a method call per row over plain iteration.
+
+        Each batch is a list of rows, or with columnar=True, a list of
+        columns (each a list of values), with short rows padded out with
+        None. With reuse=True, the same list is refilled and returned for
+        every batch, rather than a new list being made each time, so make
+        sure you're done with one batch before asking for the next.
+        """
+        return batches(self.reader, size, columnar, reuse)
+
     __next__ = next
 
     def __iter__(self):
         return self
 
 
-class OrderedDictReader(object):
+class OrderedDictReader(RowAccess):
     """A context manager that helps you read a csv file by iterating over the
     rows as (ordered) dictionaries (ie OrderedDicts).
 
-    Arguments are the same as for Reader.
+    Arguments are the same as for Reader, plus the ones the stdlib
+    DictReader takes:
+
+    Args:
+        fieldnames: The field names to use. If you skip this, the first row
+            of the file is used.
+        restkey: Key under which any extra values (from rows longer than
+            the header) are stored, as a list. Defaults to None.
+        restval: Value for any missing fields (from rows shorter than the
+            header). Defaults to None.
+
+    With columns, only those fields are put in each dictionary (and in
+    fieldnames), and values beyond the end of the header are ignored
+    rather than being stored under restkey. Rows that don't match `where`
+    are skipped before any dictionary is made for them. With index, row 0
+    is the first row after the header.
     """
 
-    def __init__(self, f, dialect=csv.excel, **kw):
+    def __init__(self, f, dialect=csv.excel, compression='infer',
+                 fieldnames=None, restkey=None, restval=None, columns=None,
+                 where=None, index=False, encoding=None, **kw):
         self.f = f
         self.dialect = dialect
         self.kw = kw
+        self.restkey = restkey
+        self.restval = restval
+
+        self.init_index(f, index, compression, encoding)
+        self.f, self.raw = open_rows(f, dialect, encoding, compression,
+                                     **kw)
+        self.reader = self.raw
+
+        if fieldnames is None:
+            fieldnames = next(self.raw, [])
+            self.first_row = 1
+        self.fieldnames = list(fieldnames)
 
-        self.f = smart_open(self.f)
+        self.predicate = None
+        self.project = None
 
-        b = dictreader(self.f, dialect=self.dialect, **self.kw)
-        self.reader = b
-        self.fieldnames = list(self.reader.fieldnames)
+        if where is not None:
+            self.predicate = compile_where(where, self.fieldnames)
+
+        if columns is not None:
+            indexes = column_indexes(columns, self.fieldnames)
+            self.fieldnames = [self.fieldnames[i] for i in indexes]
+            self.project = projection(indexes, restval)
+
+        self.reader = self.pipeline(self.raw)
+
+    def pipeline(self, rows):
+        if self.predicate is not None:
+            rows = filter(self.predicate, rows)
+
+        if self.project is not None:
+            rows = map(self.project, rows)
+        return rows
 
     def __enter__(self):
         return self
@@ -138,21 +484,207 @@ class OrderedDictReader(object):
     def close(self):
         self.f.close()
 
-    def next(self):
-        d = next(self.reader)
-        tups = [(k, d[k]) for k in self.fieldnames]
+    def make_row(self, row):
+        od = OrderedDict(zip(self.fieldnames, row))
+
+        lf = len(self.fieldnames)
+        lr = len(row)
 
-        od = OrderedDict(tups)
-        if None in d:
-            od[None] = d[None]
+        if lr > lf:
+            od[self.restkey] = row[lf:]
+        elif lr < lf:
+            for k in self.fieldnames[lr:]:
+                od[k] = self.restval
         return od
 
+    def make_columns(self, batch):
+        columns = OrderedDict()
+        values = zip_longest(*batch, fillvalue=self.restval)
+
+        for name in self.fieldnames:
+            column = next(values, None)
+
+            if column is None:  # every row in the batch is too short
+                columns[name] = [self.restval] * len(batch)
+            else:
+                columns[name] = list(column)
+        return columns
+
+    def next(self):
+        row = next(self.reader)
+
+        while not row:  # skip blank lines, like DictReader does
+            row = next(self.reader)
+        return self.make_row(row)
+
+    def iter_batches(self, size, columnar=False, reuse=False):
+        """Iterate over the rows in batches of (up to) `size` rows at a time.
+        Each batch is a list of rows (as they'd be returned by iterating),
+        or with columnar=True, an OrderedDict of field name to a list of
+        values, which doesn't need a dictionary to be made for each row.
+        Extra values in long rows are left out of columnar batches.
+
+        With reuse=True, the same list is refilled and returned for every
+        batch, as per Reader.iter_batches.
+        """
+        rows = filter(None, self.reader)  # skip blank lines
+        buffer = []
+
+        for batch in batches(rows, size):
+            if columnar:
+                yield self.make_columns(batch)
+            elif reuse:
+                buffer[:] = map(self.make_row, batch)
+                yield buffer
+            else:
+                yield [self.make_row(row) for row in batch]
+
     __next__ = next
 
     def __iter__(self):
         return self
 
 
+def identifiers(names):
+    """Make a list of field names usable as namedtuple field names.
+    Python 2 only allows ascii identifiers, so any others are replaced
+    with positional names. Anything else that's not a valid identifier
+    is taken care of by namedtuple's rename option.
+    """
+    if not six.PY2:
+        return names
+
+    def ascii(name):
+        return all(ord(c) < 128 for c in name)
+
+    return [to_str(n) if ascii(n) else to_str('_{}'.format(i))
+            for i, n in enumerate(names)]
+
+
+class NamedTupleReader(OrderedDictReader):
+    """Same as OrderedDictReader, except each row is a namedtuple, with a
+    field for each column of the header. Much smaller than an OrderedDict,
+    and quicker to create, which matters if you're keeping lots of rows
+    around in memory.
+
+    Access values by name (row.amount), by position (row[0]), or get a
+    dictionary with row._asdict(). Field names that aren't valid python
+    identifiers are renamed by position (eg _3). The namedtuple class is
+    available as `row_type`.
+
+    Arguments are the same as for OrderedDictReader. Rows shorter than the
+    header are padded with restval. Rows longer than the header raise a
+    ValueError, because there's nowhere to put the extra values.
+    """
+
+    def __init__(self, *args, **kw):
+        super(NamedTupleReader, self).__init__(*args, **kw)
+
+        self.row_type = namedtuple(to_str('Row'),
+                                   identifiers(self.fieldnames),
+                                   rename=True)
+        self._make = self.row_type._make
+
+    def make_row(self, row):
+        missing = len(self.fieldnames) - len(row)
+
+        if missing > 0:
+            row = list(row) + [self.restval] * missing
+        elif missing < 0:
+            raise ValueError('row has more fields than the header: '
+                             '{!r}'.format(row))
+        return self._make(row)
+
+
+class TypedReader(OrderedDictReader):
+    """Same as OrderedDictReader, except values are converted to ints,
+    floats, booleans, datetimes and dates, instead of all being text.
+
+    The type of each column is worked out once, from a sample of rows at
+    the start of the file, and the values in each column are then
+    converted with a converter chosen for that column. Empty values become
+    None, except in text columns. The types used are available as `types`,
+    an OrderedDict of field name to type name.
+
+    Inference is only as good as the sample: a value further on that
+    doesn't fit its column's type (text in a column of numbers, say)
+    raises a ValueError naming the column and the row (counting rows after
+    the header from 1). Give the type of such columns with `types`, or use
+    a bigger sample_size.
+
+    Same arguments as OrderedDictReader, plus:
+
+    Args:
+        types: A mapping of field name to type, for any columns whose type
+            you already know. Types can be given as names ('int', 'float',
+            'bool', 'datetime', 'date', 'text') or as the types themselves.
+        sample_size: The number of rows to infer the types from.
+    """
+
+    def __init__(self, *args, **kw):
+        types = kw.pop('types', None) or {}
+        sample_size = kw.pop('sample_size', SAMPLE_SIZE)
+
+        super(TypedReader, self).__init__(*args, **kw)
+
+        sample = list(islice(self.reader, sample_size))
+        self.reader = chain(sample, self.reader)
+
+        self.types = infer_types(self.fieldnames, sample)
+
+        for k, t in types.items():
+            self.types[k] = type_name(t)
+
+        self.converters = [converter(self.types[name])
+                           for name in self.fieldnames]
+        self.row_count = 0  # rows converted so far, for error messages
+
+    def conversion_error(self, rows, error):
+        """Find the first value in rows that can't be converted, and return
+        a ValueError that says which column and row it's in (or the original
+        error, if the value can't be found).
+        """
+        for n, row in enumerate(rows, self.row_count + 1):
+            for name, convert, x in zip(self.fieldnames, self.converters,
+                                        row):
+                if convert is None:
+                    continue
+
+                try:
+                    convert(x)
+                except (ValueError, TypeError, OverflowError) as e:
+                    return ValueError('column {!r}, row {}: {}'.format(
+                        name, n, e))
+        return error
+
+    def convert(self, row):
+        try:
+            converted = [x if c is None else c(x)
+                         for c, x in zip(self.converters, row)]
+        except (ValueError, TypeError, OverflowError) as e:
+            raise self.conversion_error([row], e)
+        self.row_count += 1
+
+        if len(row) > len(converted):
+            converted.extend(row[len(converted):])
+        return converted
+
+    def make_row(self, row):
+        return super(TypedReader, self).make_row(self.convert(row))
+
+    def make_columns(self, batch):
+        columns = super(TypedReader, self).make_columns(batch)
+
+        try:
+            for name, convert in zip(self.fieldnames, self.converters):
+                if convert is not None:
+                    columns[name] = list(map(convert, columns[name]))
+        except (ValueError, TypeError, OverflowError) as e:
+            raise self.conversion_error(batch, e)
+        self.row_count += len(batch)
+        return columns
+
+
 class Writer(object):
     """A context manager that lets you write rows to a csv file by
     specifying each row as a list/tuple (or any iterable of the right length
@@ -162,16 +694,40 @@ class Writer(object):
 
     If you're passing in an already open file, it should be in write mode
     (and text mode). If you're passing in a file name, this file will be
-    *truncated* and then written to (as per normal 'w' mode behaviour).
+    *truncated* and then written to (as per normal 'w' mode behaviour), in
+    `encoding` (which defaults to the usual default of io.open).
+
+    Files with a .gz, .bz2, .xz or .zst extension are compressed as they're
+    written (see the compression argument of Reader), and there's one more
+    argument to go with that:
+
+    Args:
+        compresslevel: The compression level. Defaults to the codec's own
+            default. zstd compression uses a thread per CPU.
+
+    Output can also be collected in memory and written out in big blocks,
+    which helps a lot on network filesystems and FUSE mounts, where lots
+    of small writes are slow:
+
+    Args:
+        buffer_size: Write to the file in blocks of (at least) this many
+            characters, for instance 4 * 1024 * 1024.
+        background: Do the writing of those blocks in a separate thread,
+            so that formatting rows and writing the file overlap.
+
+    Rows still in the buffer are written out by flush() and close().
     """
 
-    def __init__(self, f, dialect=csv.excel, **kw):
+    def __init__(self, f, dialect=csv.excel, compression='infer',
+                 compresslevel=None, buffer_size=None, background=False,
+                 encoding=None, **kw):
         self.f = f
         self.dialect = dialect
         self.kw = kw
         self.row_count = 0
 
-        self.f = smart_openw(self.f)
+        self.f = smart_openw(self.f, compression, compresslevel, buffer_size,
+                             background, encoding)
 
         self.writer = writer(self.f, dialect=self.dialect, **self.kw)
 
@@ -181,8 +737,18 @@ class Writer(object):
     def __exit__(self, type, value, traceback):
         self.close()
 
-    def close(self):
+    def flush(self):
+        """Write out any rows still buffered (on Python 2, rows are queued
+        up and written to the file in batches).
+        """
+        flush = getattr(getattr(self, 'writer', None), 'flush', None)
+
+        if flush is not None:
+            flush()
         self.f.flush()
+
+    def close(self):
+        self.flush()
         self.f.close()
 
     def write_row(self, row):
@@ -192,23 +758,66 @@ class Writer(object):
         (byte sequences are assumed to be utf-8). For instance:
         ('text', b'bytes', 10) will become ('text', 'bytes', '10').
         """
-        r = [to_text(s) for s in row]
-        self.writer.writerow(r)
+        self.writer.writerow(text_row(row))
         self.row_count += 1
 
-    def write_rows(self, rows):
+    def write_rows(self, rows, batch_size=WRITE_BATCH_SIZE):
         """Write multiple rows at once. For only the most advanced
         of users!
+
+        Rows are converted and handed to the underlying writer in batches
+        of `batch_size`, which is a lot quicker than calling write_row
+        over and over. The output is exactly the same.
         """
-        for row in rows:
-            self.write_row(row)
+        for chunk in chunks(rows, batch_size):
+            self.writer.writerows([text_row(row) for row in chunk])
+            self.row_count += len(chunk)
+
+
+def dict_to_row(fieldnames, restval='', extrasaction='raise'):
+    """Returns a function that turns a dictionary into a row of text
+    values in fieldnames order, the same way the stdlib DictWriter does
+    (restval and extrasaction mean the same thing here too).
+
+    Dictionaries with exactly the given field names as keys (the usual
+    case) are converted straight into a list, without building a new
+    dictionary or converting the keys. Anything else is handled with the
+    keys converted to text first.
+    """
+    if extrasaction not in ('raise', 'ignore'):
+        raise ValueError('extrasaction ({}) must be '
+                         "'raise' or 'ignore'".format(extrasaction))
+
+    fieldnames = list(fieldnames)
+    fieldset = frozenset(fieldnames)
+    width = len(fieldset)
+
+    def convert(d):
+        if len(d) == width:
+            try:
+                return text_row([d[k] for k in fieldnames])
+            except KeyError:
+                pass
+
+        d = {to_text(k): v for k, v in d.items()}
+
+        if extrasaction == 'raise':
+            wrong = [k for k in d if k not in fieldset]
+
+            if wrong:
+                raise ValueError('dict contains fields not in fieldnames: ' +
+                                 ', '.join([repr(x) for x in wrong]))
+        return text_row([d.get(k, restval) for k in fieldnames])
+
+    return convert
 
 
 class DictWriter(object):
     """A context manager that lets you write rows to a csv file by
     specifying each row as a dictionary of values.
 
-    Same args as for writer, with the addition of:
+    Same args as for writer (including compression, buffer_size and
+    encoding), with the addition of:
 
     Args:
         fieldnames: You can specify fieldnames explicitly here if
@@ -220,7 +829,14 @@ class DictWriter(object):
     """
 
     def __init__(self, f, **kw):
-        self.f = smart_openw(f)
+        compression = kw.pop('compression', 'infer')
+        compresslevel = kw.pop('compresslevel', None)
+        buffer_size = kw.pop('buffer_size', None)
+        background = kw.pop('background', False)
+        encoding = kw.pop('encoding', None)
+
+        self.f = smart_openw(f, compression, compresslevel, buffer_size,
+                             background, encoding)
         self.kw = kw
         self._initialized = False
         self.row_count = 0
@@ -235,15 +851,33 @@ class DictWriter(object):
         fieldnames = self.kw['fieldnames']
         self.fieldnames = list(to_text(fn) for fn in fieldnames)
         self.kw['fieldnames'] = self.fieldnames
-        self.writer = dictwriter(self.f, **self.kw)
-        self.writer.writeheader()
+
+        kw = dict(self.kw)
+        del kw['fieldnames']
+        restval = kw.pop('restval', '')
+        extrasaction = kw.pop('extrasaction', 'raise')
+
+        self.row_from_dict = dict_to_row(self.fieldnames, restval,
+                                         extrasaction)
+        self.writer = writer(self.f, **kw)
+        self.writer.writerow(self.fieldnames)
         self._initialized = True
 
     def __exit__(self, type, value, traceback):
         self.close()
 
-    def close(self):
+    def flush(self):
+        """Write out any rows still buffered (on Python 2, rows are queued
+        up and written to the file in batches).
+        """
+        flush = getattr(getattr(self, 'writer', None), 'flush', None)
+
+        if flush is not None:
+            flush()
         self.f.flush()
+
+    def close(self):
+        self.flush()
         self.f.close()
 
     def write_dict(self, d):
@@ -262,16 +896,23 @@ class DictWriter(object):
             self.kw[to_str('fieldnames')] = d.keys()
             self.initialize()
 
-        d = {to_text(k): to_text(v) for k, v in d.items()}
-        self.writer.writerow(d)
+        self.writer.writerow(self.row_from_dict(d))
         self.row_count += 1
 
-    def write_dicts(self, rows):
+    def write_dicts(self, rows, batch_size=WRITE_BATCH_SIZE):
         """Write multiple rows at once. For only the most sophisticated
         power users!
+
+        As with Writer.write_rows, rows go to the underlying writer in
+        batches of `batch_size`.
         """
-        for row in rows:
-            self.write_dict(row)
+        for chunk in chunks(rows, batch_size):
+            if not self._initialized:
+                self.kw[to_str('fieldnames')] = chunk[0].keys()
+                self.initialize()
+
+            self.writer.writerows([self.row_from_dict(d) for d in chunk])
+            self.row_count += len(chunk)
 
 
 def ordereddicts_from_text(t):
@@ -296,10 +937,157 @@ def text_from_dicts(iterable_of_dicts):
         return s.getvalue()
 
 
-def sniff_text(text):
+def native_dialect(dialect):
+    """The Python 2 csv module needs the dialect's characters as byte
+    strings, but the sniffer gives them back as text if it's given text.
+    """
+    if six.PY2:
+        for k in ('delimiter', 'quotechar', 'escapechar', 'lineterminator'):
+            x = getattr(dialect, k, None)
+
+            if isinstance(x, six.text_type):
+                setattr(dialect, k, to_str(x))
+    return dialect
+
+
+def sniff_text(text, types=False):
     """Sniff some csv text to determine format. Returns a Dialect object
     as per the stdlib csv module.
+
+    If types is True, the types of the columns are inferred as well (as
+    per TypedReader), assuming the first row is a header, and stored on
+    the dialect as `types`.
+    """
+    sniffed = native_dialect(csv.Sniffer().sniff(text))
+
+    if types:
+        rows = reader(io.StringIO(to_text(text)), sniffed)
+        fieldnames = next(rows, [])
+        sniffed.types = infer_types(fieldnames,
+                                    islice(rows, SAMPLE_SIZE))
+    return sniffed
+
+
+def guess_encoding(sample):
+    """Guess the encoding of some bytes from the start of a file. Looks
+    for a byte order mark, then tries utf-8, falling back to latin-1 (which
+    can decode anything).
     """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start < len(sample) - 3:  # not just a character cut in half
+            return 'latin-1'
+    return 'utf-8'
+
+
+def complete_lines(text):
+    """Drop anything after the last newline of a sample.
+    """
+    i = text.rfind('\n')
+    if i == -1:
+        return text
+    return text[:i + 1]
+
+
+def sniff_stream(f, sample_size=SNIFF_SIZE, middle=False):
+    """Sniff the start of a csv stream to determine its format, reading no
+    more than `sample_size` bytes, rather than needing the whole thing in
+    memory as sniff_text does.
+
+    Returns a Dialect object, as per sniff_text, with these extra
+    attributes:
+
+        has_header: Whether the first row looks like a header.
+        encoding: A guess at the encoding (for binary streams).
+        types: The inferred type of each column (as per TypedReader), keyed
+            by field name, or by position if there's no header.
+
+    The dialect can be passed straight to Reader and friends.
+
+    Args:
+        f: A stream, in binary or text mode.
+        sample_size: The most bytes (or characters) to read from the start
+            of the stream.
+        middle: Also take a sample of the same size from the middle of the
+            stream, which needs the stream to be seekable and in binary
+            mode. Useful for files where the first few thousand rows aren't
+            representative.
+
+    Seekable streams are left at the position they started at.
+    """
+    try:
+        start = f.tell()
+    except (AttributeError, IOError, ValueError):
+        start = None
+
+    sample = f.read(sample_size)
+    at_end = len(sample) < sample_size
+    text_mode = isinstance(sample, six.text_type)
+    extra = None
+
+    # text streams can't be seeked to arbitrary positions
+    if middle and start is not None and not at_end and not text_mode:
+        size = f.seek(0, io.SEEK_END)
+        halfway = start + (size - start) // 2
+        halfway -= halfway % 4  # don't start in the middle of a utf-32 char
+
+        if halfway > start + sample_size:
+            f.seek(halfway)
+            extra = f.read(sample_size)
+
+    if start is not None:
+        f.seek(start)
+
+    if text_mode:
+        encoding = getattr(f, 'encoding', None)
+
+        def decode(x):
+            return x
+    else:
+        encoding = guess_encoding(sample)
+
+        def decode(x):
+            return x.decode(encoding, 'replace')
+
+    text = decode(sample)
+
+    if not at_end:
+        text = complete_lines(text)
+
+    if extra:
+        extra = decode(extra)
+        text += complete_lines(extra[extra.find('\n') + 1:])
+
     sniffer = csv.Sniffer()
-    sniffed = sniffer.sniff(text)
+    sniffed = native_dialect(sniffer.sniff(text))
+
+    try:
+        sniffed.has_header = sniffer.has_header(to_str(text))
+    except csv.Error:
+        sniffed.has_header = False
+
+    sniffed.encoding = encoding
+
+    rows = reader(io.StringIO(text), sniffed)
+    first = list(next(rows, []))
+
+    if sniffed.has_header:
+        fieldnames = first
+    else:
+        fieldnames = list(range(len(first)))
+        rows = chain([first], rows)
+
+    sniffed.types = infer_types(fieldnames, rows)
     return sniffed
+
+
+def sniff_file(path, sample_size=SNIFF_SIZE, middle=False):
+    """Same as sniff_stream, but for a file name.
+    """
+    with io.open(path, 'rb') as f:
+        return sniff_stream(f, sample_size, middle)
@@ -0,0 +1,235 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict, namedtuple
+import csv
+import shutil
+import tempfile
+
+from six.moves import map
+
+from .csv import Reader
+from .joins import MEMORY, MAX_PARTITIONS, Side, file_size, partition
+from .records import dialect_params
+from .selection import projection
+
+STRATEGIES = ('auto', 'hash', 'merge')
+
+
+class Change(namedtuple('Change', 'kind key old new changes')):
+    """A difference between two files.
+
+    kind is 'added', 'removed' or 'changed'. key is the value of the key
+    column (or a tuple of them, if there's more than one). old and new are
+    the rows as OrderedDicts (None for an added or removed row), and for
+    changed rows, changes is an OrderedDict of column to (old value, new
+    value).
+    """
+
+    __slots__ = ()
+
+
+class Differ(object):
+    """Compares rows from the old and new files, which have been lined up
+    to the same columns.
+    """
+
+    def __init__(self, fieldnames):
+        self.fieldnames = fieldnames
+
+    def as_dict(self, row):
+        return OrderedDict(zip(self.fieldnames, row))
+
+    def added(self, key, row):
+        return Change('added', key, None, self.as_dict(row), None)
+
+    def removed(self, key, row):
+        return Change('removed', key, self.as_dict(row), None, None)
+
+    def compare(self, key, old, new):
+        """Returns a Change, or None if the rows are the same. Rows are
+        compared whole first, which is quick, so fields are only looked at
+        one by one for rows that have changed.
+        """
+        if old == new:
+            return None
+
+        changes = OrderedDict(
+            (name, (a, b))
+            for name, a, b in zip(self.fieldnames, old, new) if a != b)
+        return Change('changed', key, self.as_dict(old), self.as_dict(new),
+                      changes)
+
+
+def duplicate(key):
+    return ValueError('duplicate key: {!r}'.format(key))
+
+
+def merge_diff(old, new, differ):
+    """Diff two files sorted by key, one row from each at a time.
+    """
+    def checked(side, name):
+        previous = None
+        first = True
+        key = side.key
+
+        for row in side.rows():
+            k = key(row)
+
+            if not first and not previous < k:
+                if k == previous:
+                    raise duplicate(k)
+                raise ValueError('{} file is not sorted by the key columns '
+                                 '({!r} comes after {!r})'.format(
+                                     name, k, previous))
+            previous = k
+            first = False
+            yield k, row
+
+    olds = checked(old, 'old')
+    news = checked(new, 'new')
+    o = next(olds, None)
+    n = next(news, None)
+
+    while o is not None or n is not None:
+        if n is None or (o is not None and o[0] < n[0]):
+            yield differ.removed(*o)
+            o = next(olds, None)
+
+        elif o is None or n[0] < o[0]:
+            yield differ.added(*n)
+            n = next(news, None)
+
+        else:
+            change = differ.compare(o[0], o[1], n[1])
+            if change is not None:
+                yield change
+            o = next(olds, None)
+            n = next(news, None)
+
+
+def hash_diff(old, new, differ):
+    """Diff two files by loading the old one into a hash table by key and
+    streaming the new one past it.
+    """
+    table = {}
+    key = old.key
+
+    for row in old.rows():
+        k = key(row)
+        if k in table:
+            raise duplicate(k)
+        table[k] = row
+
+    key = new.key
+
+    for row in new.rows():
+        k = key(row)
+        previous = table.pop(k, None)
+
+        if previous is None:
+            yield differ.added(k, row)
+        else:
+            change = differ.compare(k, previous, row)
+            if change is not None:
+                yield change
+
+    for k in sorted(table):
+        yield differ.removed(k, table[k])
+
+
+def partitioned_diff(old, new, differ, n, tmpdir, params):
+    """Partition both files by a hash of the key, and diff each pair of
+    partitions in turn, so only one partition needs to fit in memory.
+    """
+    tmp = tempfile.mkdtemp(prefix='csvx-diff-', dir=tmpdir)
+
+    try:
+        opaths = partition(old, n, tmp, 'old', params)
+        npaths = partition(new, n, tmp, 'new', params)
+
+        for opath, npath in zip(opaths, npaths):
+            with Reader(opath, compression=None, **params) as orows, \
+                    Reader(npath, compression=None, **params) as nrows:
+                changes = hash_diff(old.with_rows(orows),
+                                    new.with_rows(nrows), differ)
+                for change in changes:
+                    yield change
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def aligned(side, fieldnames, key):
+    """Rearrange a side's rows to the given columns, with columns it
+    doesn't have left empty.
+    """
+    width = len(side.fieldnames)
+    indexes = [side.fieldnames.index(name) if name in side.fieldnames
+               else width for name in fieldnames]
+    project = projection(indexes, missing='')
+    return Side(fieldnames, key, map(project, side.rows()))
+
+
+def diff(old, new, key, strategy='auto', memory=MEMORY, tmpdir=None,
+         dialect=csv.excel, **kw):
+    """Compare two versions of a csv file, matching up rows by a key column
+    (or columns), which should be unique.
+
+    Yields a Change for each row that was added, removed or changed.
+    Columns are matched up by name; a column only in one of the files is
+    treated as empty in the other.
+
+    Args:
+        old, new: The files to compare. Both need a header row.
+        key: The key column, or a list of them.
+        strategy: 'hash' loads the old file into memory (or, when it's
+            bigger than `memory`, splits both files into partitions by a
+            hash of the key, in `tmpdir`, and compares a partition at a
+            time). Changed and added rows come in the order of the new
+            file, followed by removed rows.
+            'merge' needs both files sorted by the key columns (for example
+            with csvx.sort) and only holds a row from each in memory.
+            Changes come in key order.
+            'auto' (the default) is 'hash'.
+        dialect, kw: As for Reader.
+
+    Raises ValueError for duplicate keys, and (with 'merge') for files
+    that aren't sorted.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(
+            'strategy should be one of {}'.format(', '.join(STRATEGIES)))
+    if not isinstance(key, (list, tuple)):
+        key = [key]
+
+    params = dialect_params(dialect, kw)
+
+    with Reader(old, **params) as orows, Reader(new, **params) as nrows:
+        oside = Side(list(next(orows, [])), key, orows)
+        nside = Side(list(next(nrows, [])), key, nrows)
+
+        fieldnames = oside.fieldnames + [
+            name for name in nside.fieldnames
+            if name not in oside.fieldnames]
+
+        if oside.fieldnames != fieldnames:
+            oside = aligned(oside, fieldnames, key)
+        if nside.fieldnames != fieldnames:
+            nside = aligned(nside, fieldnames, key)
+
+        differ = Differ(fieldnames)
+
+        if strategy == 'merge':
+            changes = merge_diff(oside, nside, differ)
+        else:
+            size = file_size(old)
+
+            if size is not None and size > memory:
+                n = min((size // memory + 1) * 2, MAX_PARTITIONS)
+                changes = partitioned_diff(oside, nside, differ, n, tmpdir,
+                                           params)
+            else:
+                changes = hash_diff(oside, nside, differ)
+
+        for change in changes:
+            yield change
@@ -0,0 +1,132 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import json
+import os
+
+import six
+
+from .records import iter_records, is_blank
+
+INDEX_SUFFIX = '.csvxidx'
+EVERY = 1000
+
+
+def index_path(path):
+    """The file name of the sidecar index for a csv file.
+    """
+    return path + INDEX_SUFFIX
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime
+
+
+class RowIndex(object):
+    """The byte offset of every `every`th record in a csv file, along with
+    the total number of records. Blank lines don't count as records.
+
+    Build one with build_index, or load a saved one with RowIndex.load.
+    """
+
+    def __init__(self, count, every, offsets, size=None, mtime=None):
+        self.count = count
+        self.every = every
+        self.offsets = offsets
+        self.size = size
+        self.mtime = mtime
+
+    def __len__(self):
+        return self.count
+
+    def locate(self, n):
+        """Find record n. Returns the offset of the nearest indexed record
+        at or before it, and the number of records to skip from there.
+        """
+        if n < 0:
+            n += self.count
+
+        if not 0 <= n < self.count:
+            raise IndexError('row {} out of range'.format(n))
+
+        return self.offsets[n // self.every], n % self.every
+
+    def save(self, path):
+        data = {
+            'count': self.count,
+            'every': self.every,
+            'offsets': self.offsets,
+            'size': self.size,
+            'mtime': self.mtime,
+        }
+
+        with io.open(index_path(path), 'w') as f:
+            f.write(six.text_type(json.dumps(data)))
+
+    @classmethod
+    def load(cls, path):
+        """Load the saved index for a csv file. Returns None if there isn't
+        one, or if the file has changed size or been modified since the
+        index was built.
+        """
+        try:
+            with io.open(index_path(path)) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if (data.get('size'), data.get('mtime')) != file_signature(path):
+            return None
+
+        return cls(data['count'], data['every'], data['offsets'],
+                   data['size'], data['mtime'])
+
+
+def build_index(path, every=EVERY, quotechar=b'"', save=True):
+    """Scan a csv file and record the byte offset of every `every`th
+    record, so that the file can later be jumped into at any row without
+    reading everything before it. Newlines inside quoted fields are taken
+    care of (see csvx.records.chunk_offsets).
+
+    The index is saved alongside the file (as the file name plus
+    '.csvxidx'), unless save is False, and is ignored from then on if the
+    file's size or modification time changes. Returns the RowIndex.
+    """
+    size, mtime = file_signature(path)
+
+    offsets = []
+    count = 0
+    position = 0
+
+    with io.open(path, 'rb') as f:
+        for record in iter_records(f, quotechar):
+            if not is_blank(record):
+                if count % every == 0:
+                    offsets.append(position)
+                count += 1
+            position += len(record)
+
+    index = RowIndex(count, every, offsets, size, mtime)
+
+    if save:
+        index.save(path)
+    return index
+
+
+def load_or_build_index(path, every=EVERY, quotechar=b'"'):
+    """Load the saved index for a csv file, building (and saving) a new one
+    if it's missing or out of date. If the new one can't be saved, it's
+    returned anyway.
+    """
+    index = RowIndex.load(path)
+
+    if index is None:
+        index = build_index(path, every, quotechar, save=False)
+
+        try:
+            index.save(path)
+        except (IOError, OSError):
+            pass
+    return index
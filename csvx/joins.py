@@ -0,0 +1,315 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+import csv
+from itertools import groupby
+from operator import itemgetter
+import os
+import shutil
+import tempfile
+import zlib
+
+import six
+
+from .compression import is_path
+from .csv import Reader, Writer
+from .records import dialect_params
+from .selection import column_indexes
+
+MEMORY = 256 * 1024 * 1024
+MAX_PARTITIONS = 256
+
+HOWS = ('inner', 'left', 'right', 'outer')
+STRATEGIES = ('auto', 'hash', 'merge', 'grace')
+
+
+class Side(object):
+    """One side of a join: the column names, how to get the key out of a
+    row, and the rows themselves (padded out to the full width, with blank
+    lines skipped).
+    """
+
+    def __init__(self, fieldnames, on, rows):
+        self.fieldnames = fieldnames
+        self.indexes = column_indexes(on, fieldnames)
+        self.key = itemgetter(*self.indexes)
+        self.width = len(fieldnames)
+        self.source = rows
+
+    def rows(self):
+        width = self.width
+
+        for row in self.source:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            yield row
+
+    def with_rows(self, rows):
+        return Side(self.fieldnames, self.indexes, rows)
+
+
+def sorted_groups(side, name):
+    """Group consecutive rows with the same key, checking that the keys
+    are in order.
+    """
+    previous = None
+
+    for key, rows in groupby(side.rows(), side.key):
+        if previous is not None and key < previous:
+            raise ValueError('{} file is not sorted by the join columns '
+                             '({!r} comes after {!r})'.format(
+                                 name, key, previous))
+        previous = key
+        yield key, rows
+
+
+def merge_join(left, right, how):
+    """Join two files that are both sorted by the join columns, keeping
+    only one group of rows with the same key in memory at a time.
+    """
+    keep_left = how in ('left', 'outer')
+    keep_right = how in ('right', 'outer')
+
+    lgroups = sorted_groups(left, 'left')
+    rgroups = sorted_groups(right, 'right')
+    lgroup = next(lgroups, None)
+    rgroup = next(rgroups, None)
+
+    while lgroup is not None or rgroup is not None:
+        if rgroup is None or (lgroup is not None and lgroup[0] < rgroup[0]):
+            if keep_left:
+                for row in lgroup[1]:
+                    yield row, None
+            lgroup = next(lgroups, None)
+
+        elif lgroup is None or rgroup[0] < lgroup[0]:
+            if keep_right:
+                for row in rgroup[1]:
+                    yield None, row
+            rgroup = next(rgroups, None)
+
+        else:
+            matches = list(rgroup[1])
+            for row in lgroup[1]:
+                for match in matches:
+                    yield row, match
+            lgroup = next(lgroups, None)
+            rgroup = next(rgroups, None)
+
+
+def hash_join(left, right, how, build_left=False):
+    """Load one side (the build side) into a hash table by key, and stream
+    the other side past it.
+    """
+    if build_left:
+        build, probe = left, right
+        keep_probe = how in ('right', 'outer')
+        keep_build = how in ('left', 'outer')
+    else:
+        build, probe = right, left
+        keep_probe = how in ('left', 'outer')
+        keep_build = how in ('right', 'outer')
+
+    def pair(row, match):
+        return (match, row) if build_left else (row, match)
+
+    table = OrderedDict() if keep_build else {}
+    key = build.key
+
+    for row in build.rows():
+        k = key(row)
+        matches = table.get(k)
+
+        if matches is None:
+            table[k] = [row]
+        else:
+            matches.append(row)
+
+    matched = set()
+    key = probe.key
+
+    for row in probe.rows():
+        k = key(row)
+        matches = table.get(k)
+
+        if matches is None:
+            if keep_probe:
+                yield pair(row, None)
+            continue
+
+        if keep_build:
+            matched.add(k)
+        for match in matches:
+            yield pair(row, match)
+
+    if keep_build:
+        for k, rows in six.iteritems(table):
+            if k not in matched:
+                for row in rows:
+                    yield pair(None, row)
+
+
+def partition(side, n, tmp, name, params):
+    """Split a side's rows into n files by a hash of the key, so that
+    matching rows end up in the same numbered partition on both sides.
+    """
+    paths = [os.path.join(tmp, '{}-{}.csv'.format(name, i)) for i in range(n)]
+    writers = [Writer(path, compression=None, **params) for path in paths]
+
+    try:
+        key = side.key
+        for row in side.rows():
+            k = six.text_type(key(row)).encode('utf-8')
+            writers[zlib.crc32(k) % n].write_row(row)
+    finally:
+        for w in writers:
+            w.close()
+    return paths
+
+
+def grace_join(left, right, how, n, tmpdir, params):
+    """Partition both sides by a hash of the key, then hash join each pair
+    of partitions in turn, so only one partition needs to fit in memory.
+    Rows come out grouped by partition rather than in file order.
+    """
+    tmp = tempfile.mkdtemp(prefix='csvx-join-', dir=tmpdir)
+
+    try:
+        lpaths = partition(left, n, tmp, 'left', params)
+        rpaths = partition(right, n, tmp, 'right', params)
+
+        for lpath, rpath in zip(lpaths, rpaths):
+            with Reader(lpath, compression=None, **params) as lr, \
+                    Reader(rpath, compression=None, **params) as rr:
+                pairs = hash_join(left.with_rows(lr), right.with_rows(rr),
+                                  how)
+                for pair in pairs:
+                    yield pair
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def file_size(f):
+    if is_path(f):
+        try:
+            return os.path.getsize(f)
+        except OSError:
+            pass
+    return None
+
+
+def join(left, right, out, on, how='inner', strategy='auto', memory=MEMORY,
+         suffix='_right', tmpdir=None, dialect=csv.excel, **kw):
+    """Join two csv files on one or more key columns, and write the result
+    to a third.
+
+    The output has the left file's columns, followed by the right file's
+    columns apart from the key columns. Right columns whose names clash
+    with a left column get `suffix` added to them. Keys are compared as
+    text.
+
+    Args:
+        left, right: The files to join (by name or as file objects). Both
+            need a header row.
+        out: Where to write the joined rows.
+        on: The column (or list of columns) to join on, which must be in
+            both files.
+        how: 'inner' (only matching rows), 'left' (all the left rows, with
+            empty right values where there's no match), 'right' or
+            'outer' (all the rows from both).
+        strategy: How to do the join:
+            'hash' loads the smaller file (or the right file if their sizes
+            aren't known) into a hash table by key, and streams the other
+            one past it. Rows come out in the order of the streamed file,
+            followed by any unmatched rows of the loaded file.
+            'merge' needs both files to be sorted by the join columns
+            (for example with csvx.sort) and only keeps the rows for one
+            key in memory. Rows come out in key order. A ValueError is
+            raised if a file turns out not to be sorted.
+            'grace' splits both files into partitions by a hash of the
+            key in `tmpdir`, and hash joins each pair of partitions, when
+            neither file fits in memory.
+            'auto' (the default) uses 'grace' when the smaller file is
+            bigger than `memory`, and 'hash' otherwise.
+        memory: Roughly how many bytes of the build file can be held in
+            memory.
+        dialect, kw: As for Reader and Writer.
+        encoding: The encoding of both files, which the output is written
+            in too.
+
+    Returns the number of rows written, not counting the header.
+    """
+    if how not in HOWS:
+        raise ValueError('how should be one of {}'.format(', '.join(HOWS)))
+    if strategy not in STRATEGIES:
+        raise ValueError(
+            'strategy should be one of {}'.format(', '.join(STRATEGIES)))
+    if not isinstance(on, (list, tuple)):
+        on = [on]
+
+    # both inputs, the partitions and the output all use the one encoding
+    encoding = kw.pop('encoding', None)
+    params = dict(dialect_params(dialect, kw), encoding=encoding)
+    lsize, rsize = file_size(left), file_size(right)
+    build_left = lsize is not None and rsize is not None and lsize < rsize
+    build_size = lsize if build_left else rsize
+
+    if strategy == 'auto':
+        too_big = build_size is not None and build_size > memory
+        strategy = 'grace' if too_big else 'hash'
+
+    with Reader(left, **params) as lr, Reader(right, **params) as rr:
+        lside = Side(list(next(lr, [])), on, lr)
+        rside = Side(list(next(rr, [])), on, rr)
+
+        if strategy == 'merge':
+            pairs = merge_join(lside, rside, how)
+        elif strategy == 'hash':
+            pairs = hash_join(lside, rside, how, build_left)
+        else:
+            n = (build_size or memory) // memory + 1
+            n = min(n * 2, MAX_PARTITIONS)
+            pairs = grace_join(lside, rside, how, n, tmpdir, params)
+
+        rkeep = [i for i in range(rside.width) if i not in rside.indexes]
+        fieldnames = list(lside.fieldnames)
+        for i in rkeep:
+            name = rside.fieldnames[i]
+            fieldnames.append(name + suffix if name in fieldnames else name)
+
+        rows = combine(pairs, lside, rside, rkeep)
+
+        with Writer(out, **params) as w:
+            w.write_row(fieldnames)
+            w.write_rows(rows)
+            return w.row_count - 1
+
+
+def combine(pairs, left, right, rkeep):
+    """Turn matched (left row, right row) pairs into output rows. Rows
+    missing from the left get their key values from the right row.
+    """
+    lblank = [''] * left.width
+    rblank = [''] * len(rkeep)
+    rpick = itemgetter(*rkeep) if rkeep else None
+
+    def right_values(row):
+        if rpick is None:
+            return []
+        values = rpick(row)
+        return list(values) if len(rkeep) > 1 else [values]
+
+    for lrow, rrow in pairs:
+        if rrow is None:
+            yield lrow + rblank
+            continue
+
+        if lrow is None:
+            lrow = list(lblank)
+            for i, j in zip(left.indexes, right.indexes):
+                lrow[i] = rrow[j]
+
+        yield lrow + right_values(rrow)
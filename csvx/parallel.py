@@ -0,0 +1,278 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import deque
+import csv
+import io
+from itertools import chain, islice
+import multiprocessing
+
+from six.moves import queue
+
+from .csv import binary_reader, chunks, smart_openw, text_row, to_bytes, \
+    writer
+from .records import ascii_compatible, chunk_offsets, read_record, \
+    dialect_params, quote_character
+
+CHUNK_SIZE = 16 * 1024 * 1024
+WRITE_CHUNK_SIZE = 10000
+
+
+def read_chunk(job):
+    path, start, end, encoding, params = job
+
+    with io.open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    rows = binary_reader(io.BytesIO(data), encoding, **params)
+    return [list(row) for row in rows]
+
+
+def read_chunk_safely(job):
+    """Same as read_chunk, but returns (error, rows) rather than raising, so
+    that a callback hears about failures too.
+    """
+    try:
+        return None, read_chunk(job)
+    except Exception as e:
+        return e, None
+
+
+def format_chunk(job):
+    rows, params = job
+    out = io.StringIO()
+    w = writer(out, **params)
+    w.writerows([text_row(row) for row in rows])
+
+    if hasattr(w, 'flush'):
+        w.flush()
+    return out.getvalue()
+
+
+class ParallelReader(object):
+    """A context manager that reads a csv file using several processes at
+    once. Iterates over the rows in one-list-per-row fashion, just like
+    Reader.
+
+    The file is split into chunks of about `chunk_size` bytes, each
+    starting at the beginning of a record (newlines inside quoted fields
+    are fine), and each chunk is parsed by a process from a pool.
+
+    The parsed rows are pickled to send them back to this process, and
+    unpickling them costs about as much as parsing the text did, so this
+    is only quicker than Reader when there are several cores free to do
+    the parsing, and slower on one (about 7 times slower with 2 workers on
+    a single CPU). benchmarks/parallel_read.py compares the two.
+
+    Args:
+        f (filename): The path of the file. Unlike Reader, this has to be a
+            file name, because each worker opens the file separately.
+        dialect: As for Reader. Quotes need to be escaped by doubling them
+            (as the default dialect does) for the file to be split
+            correctly.
+        workers: The number of processes to use. Defaults to the number of
+            CPUs.
+        chunk_size: Roughly how many bytes each process parses at a time.
+        ordered: If True (the default), rows come back in the order they
+            appear in the file. If False, rows from each chunk come back as
+            soon as that chunk is done, which can be quicker.
+        header: If True, the first row is read up front and kept as
+            `fieldnames`, rather than being returned as a row. Useful with
+            ordered=False, where the first row returned won't necessarily
+            be the first row of the file.
+        encoding: The encoding of the file. It has to be ascii-compatible
+            (see records.ascii_compatible), because the file is split by
+            looking for newlines in the raw bytes.
+        kw (kwargs): As for Reader.
+
+    At most two chunks per worker are being parsed or waiting to be
+    iterated over at once, so a slow consumer holds up the workers rather
+    than the whole parsed file piling up in memory.
+    """
+
+    def __init__(self, f, dialect=csv.excel, workers=None,
+                 chunk_size=CHUNK_SIZE, ordered=True, header=False,
+                 encoding='utf-8', **kw):
+        self.f = f
+        self.dialect = dialect
+        self.kw = kw
+        self.fieldnames = None
+
+        if not ascii_compatible(encoding):
+            raise ValueError('ParallelReader needs an ascii-compatible '
+                             'encoding, not {!r}'.format(encoding))
+
+        params = dialect_params(dialect, kw)
+
+        quotechar = quote_character(params)
+        if quotechar:
+            quotechar = to_bytes(quotechar)
+
+        with io.open(f, 'rb') as b:
+            if header:
+                self.fieldnames = self.read_header(b, encoding, params,
+                                                   quotechar)
+            offsets = chunk_offsets(b, chunk_size, quotechar)
+
+        jobs = [(f, start, end, encoding, params)
+                for start, end in zip(offsets, offsets[1:])]
+
+        self.workers = workers or multiprocessing.cpu_count()
+        self.pool = multiprocessing.Pool(self.workers)
+
+        if ordered:
+            chunks = self.read_ordered(jobs)
+        else:
+            chunks = self.read_unordered(jobs)
+        self.rows = chain.from_iterable(chunks)
+
+    def read_ordered(self, jobs):
+        pending = deque()
+
+        for job in jobs:
+            pending.append(self.pool.apply_async(read_chunk, (job,)))
+
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().get()
+
+        while pending:
+            yield pending.popleft().get()
+
+    def read_unordered(self, jobs):
+        done = queue.Queue()
+        jobs = iter(jobs)
+        running = 0
+
+        while True:
+            for job in islice(jobs, 2 * self.workers - running):
+                self.pool.apply_async(read_chunk_safely, (job,),
+                                      callback=done.put)
+                running += 1
+
+            if not running:
+                return
+
+            error, rows = done.get()
+            running -= 1
+
+            if error is not None:
+                raise error
+            yield rows
+
+    @staticmethod
+    def read_header(b, encoding, params, quotechar):
+        raw = read_record(b, quotechar)
+        rows = binary_reader(io.BytesIO(raw), encoding, **params)
+        return list(next(rows, []))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def next(self):
+        return next(self.rows)
+
+    __next__ = next
+
+    def __iter__(self):
+        return self
+
+
+class ParallelWriter(object):
+    """A context manager that writes a csv file using several processes to
+    format the rows. Rows are sent to a pool in chunks of `chunk_size`,
+    each worker turns its chunk into csv text, and the text is written to
+    the file in the original order. The output is exactly the same as
+    Writer's.
+
+    Worth it when converting and quoting the values is what takes the
+    time. The rows need to be picklable, to be sent to the workers.
+
+    Args:
+        f: As for Writer.
+        dialect, compression, compresslevel, buffer_size, background, kw:
+            As for Writer.
+        workers: The number of processes to use. Defaults to the number of
+            CPUs.
+        chunk_size: How many rows each worker formats at a time.
+
+    At most two chunks per worker are waiting to be written at once, so
+    memory use stays bounded however many rows are written.
+    """
+
+    def __init__(self, f, dialect=csv.excel, workers=None,
+                 chunk_size=WRITE_CHUNK_SIZE, compression='infer',
+                 compresslevel=None, buffer_size=None, background=False,
+                 **kw):
+        self.params = dialect_params(dialect, kw)
+        self.chunk_size = chunk_size
+        self.workers = workers or multiprocessing.cpu_count()
+        self.row_count = 0
+        self.rows = []
+        self.pending = deque()
+
+        self.f = smart_openw(f, compression, compresslevel, buffer_size,
+                             background)
+        self.pool = multiprocessing.Pool(self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.close()
+        else:
+            self.pool.terminate()
+            self.pool.join()
+            self.f.close()
+
+    def submit(self, chunk):
+        job = (chunk, self.params)
+        self.pending.append(self.pool.apply_async(format_chunk, (job,)))
+
+        while len(self.pending) > 2 * self.workers:
+            self.f.write(self.pending.popleft().get())
+
+    def write_row(self, row):
+        self.rows.append(row)
+        self.row_count += 1
+
+        if len(self.rows) >= self.chunk_size:
+            self.submit(self.rows)
+            self.rows = []
+
+    def write_rows(self, rows):
+        if self.rows:
+            self.submit(self.rows)
+            self.rows = []
+
+        for chunk in chunks(rows, self.chunk_size):
+            self.submit(chunk)
+            self.row_count += len(chunk)
+
+    def flush(self):
+        """Wait for the workers to format all the rows written so far, and
+        write them out.
+        """
+        if self.rows:
+            self.submit(self.rows)
+            self.rows = []
+
+        while self.pending:
+            self.f.write(self.pending.popleft().get())
+        self.f.flush()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.close()
+            self.pool.join()
+            self.f.close()
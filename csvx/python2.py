@@ -1,51 +1,57 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import codecs
 import io
 import csv
+from itertools import islice
 
+from .records import ascii_compatible
 
-def decode(x):
-    if x is None:
-        return x
-    return x.decode('utf-8')
 
-
-def encode(x):
-    if x is None:
-        return x
-    return x.encode('utf-8')
-
-
-class UTF8Recoder(object):
-    """
-    Iterator that reads a text stream and reencodes the input to UTF-8
+def native(kwds):
+    """The Python 2 csv module needs dialect characters (delimiter and so
+    on) as byte strings.
     """
+    return {k: v.encode('utf-8') if isinstance(v, unicode) else v  # noqa
+            for k, v in kwds.items()}
 
-    def __init__(self, f):
-        self.f = f
 
-    def __iter__(self):
-        return self
-
-    def next(self):
-        x = self.f.next()
-        return x.encode("utf-8")
+def utf8_lines(lines):
+    for line in lines:
+        if isinstance(line, unicode):  # noqa
+            line = line.encode('utf-8')
+        yield line
 
 
 class TextReader(object):
     """
-    Accepts text streams. Used for wrapping a python-2 csv `reader`
-    (which reads bytes).
+    Wraps a python-2 csv `reader` (which reads bytes), giving rows of text.
+
+    With an encoding, f is a binary stream in that encoding. If the
+    encoding is ascii compatible, the bytes are parsed as they are (so any
+    iterable of byte lines will do) and each field is decoded once. Other
+    encodings are decoded as the file is read, and passed on to the csv
+    module as utf-8.
+
+    Without one, f is a text stream (lines that are already byte strings
+    are taken to be utf-8).
     """
 
-    def __init__(self, f, dialect=csv.excel, **kwds):
-        f = UTF8Recoder(f)
-        self.reader = csv.reader(f, dialect=dialect, **kwds)
+    def __init__(self, f, dialect=csv.excel, encoding=None, **kwds):
+        if encoding is None:
+            f = utf8_lines(f)
+            encoding = 'utf-8'
+        elif not ascii_compatible(encoding):
+            f = utf8_lines(codecs.getreader(encoding)(f))
+            encoding = 'utf-8'
+
+        self.decode = codecs.getdecoder(encoding)
+        self.reader = csv.reader(f, dialect=dialect, **native(kwds))
 
     def next(self):
-        row = self.reader.next()
-        return list(r.decode('utf-8') for r in row)
+        decode = self.decode
+        return [decode(x)[0] for x in self.reader.next()]
 
     __next__ = next
 
@@ -53,93 +59,67 @@ class TextReader(object):
         return self
 
 
-class TextDictReader(object):
-    """
-    Same as TextReader, but wrapping DictReader
-    """
-
-    def __init__(self, f, dialect=csv.excel, **kwds):
-        f = UTF8Recoder(f)
-        self.reader = csv.DictReader(f, dialect=dialect, **kwds)
-        self.fieldnames = self.reader.fieldnames
-        self.fieldnames = list(r.decode('utf-8')
-                               for r in self.reader.fieldnames)
-
-    def next(self):
-        row = self.reader.next()
-
-        def decode_value(k, v):
-            if k is None:
-                return [x.decode('utf-8') for x in v]
+FLUSH_SIZE = 64 * 1024
+WRITE_BATCH_SIZE = 1000
 
-            if v is None:
-                return v
-            return v.decode('utf-8')
 
-        return {decode(k): decode_value(k, v) for k, v in row.items()}
+def encode_value(x):
+    if isinstance(x, unicode):  # noqa
+        return x.encode('utf-8')
+    return x
 
-    __next__ = next
 
-    def __iter__(self):
-        return self
+def encode_row(row):
+    return [encode_value(x) for x in row]
 
 
-class TextWriter(object):
-    """Wraps a python2 csv writer for writing to text streams
+class QueuedWriter(object):
+    """Rows are written (as utf-8) to an in-memory queue by the python2 csv
+    writer, and the queue is decoded and written to the text stream in one
+    go once it holds `flush_size` bytes, at the end of each writerows, and
+    on flush().
     """
 
-    def __init__(self, f, dialect=csv.excel, **kwds):
+    def __init__(self, f, flush_size=FLUSH_SIZE):
         self.queue = io.BytesIO()
-        self.writer = csv.writer(self.queue, dialect=dialect, **kwds)
         self.stream = f
+        self.flush_size = flush_size
 
     def writerow(self, row):
-        e = [s.encode('utf-8') for s in row]
-        self.writer.writerow(e)
-        # Fetch UTF-8 output from the queue ...
-        data = self.queue.getvalue()
+        self.writer.writerow(encode_row(row))
 
-        data = data.decode('utf-8')
-        # ... and reencode it into the target encoding
-        self.stream.write(data)
-        # empty queue
-        self.queue.seek(0)
-        self.queue.truncate(0)
+        if self.queue.tell() >= self.flush_size:
+            self.flush()
 
     def writerows(self, rows):
-        for row in rows:
-            self.writerow(row)
+        rows = iter(rows)
 
+        while True:
+            batch = [encode_row(row)
+                     for row in islice(rows, WRITE_BATCH_SIZE)]
 
-class TextDictWriter(object):
-    """Same as TextWriter, but for DictWriter
-    """
-
-    def __init__(self, f, fieldnames, **kwds):
-        self.queue = io.BytesIO()
-        _fieldnames = [fn.encode('utf-8') for fn in fieldnames]
-        self._fieldnames = _fieldnames
-        self.writer = csv.DictWriter(self.queue,
-                                     fieldnames=_fieldnames,
-                                     **kwds)
-        self.stream = f
+            if not batch:
+                break
+            self.writer.writerows(batch)
 
-    def writeheader(self):
-        self.writer.writeheader()
+            if self.queue.tell() >= self.flush_size:
+                self.flush()
+        self.flush()
 
-    def writerow(self, row):
-        e = {encode(k): encode(v) for k, v in row.items()}
-        self.writer.writerow(e)
-        # Fetch UTF-8 output from the queue ...
+    def flush(self):
         data = self.queue.getvalue()
 
-        data = data.decode('utf-8')
-        # ... and reencode it into the target encoding
-        self.stream.write(data)
-        # empty queue
-        self.queue.seek(0)
-        self.queue.truncate(0)
+        if data:
+            self.stream.write(data.decode('utf-8'))
+            self.queue.seek(0)
+            self.queue.truncate(0)
 
-    def writerows(self, rows):
-        for row in rows:
-            self.writerow(row)
+
+class TextWriter(QueuedWriter):
+    """Wraps a python2 csv writer for writing to text streams
+    """
+
+    def __init__(self, f, dialect=csv.excel, flush_size=FLUSH_SIZE, **kwds):
+        super(TextWriter, self).__init__(f, flush_size)
+        self.writer = csv.writer(self.queue, dialect=dialect,
+                                 **native(kwds))
@@ -0,0 +1,223 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import codecs
+import csv
+
+BLOCK_SIZE = 1024 * 1024
+
+DIALECT_ATTRIBUTES = ('delimiter', 'quotechar', 'escapechar', 'doublequote',
+                      'skipinitialspace', 'lineterminator', 'quoting',
+                      'strict')
+
+
+def dialect_params(dialect, kw):
+    """Flatten a dialect (and any overrides) into plain keyword arguments,
+    so they can be sent to other processes. Sniffed dialects are classes
+    created on the fly, which can't be pickled.
+    """
+    if not hasattr(dialect, 'delimiter'):
+        dialect = csv.get_dialect(dialect)
+
+    params = {}
+
+    for k in DIALECT_ATTRIBUTES:
+        if hasattr(dialect, k):
+            params[k] = getattr(dialect, k)
+    params.update(kw)
+    return params
+
+
+def quote_character(params):
+    """The quote character of a dialect (flattened by dialect_params), or
+    None if the dialect doesn't quote.
+    """
+    if params.get('quoting') == csv.QUOTE_NONE:
+        return None
+    return params.get('quotechar') or None
+
+
+def ascii_compatible(encoding):
+    """Whether text in an encoding can be parsed by the csv module as it
+    is: ascii characters have to be the same single bytes as in ascii, and
+    those bytes can't turn up as part of other characters. True of utf-8
+    and the single byte encodings (latin-1, cp1252 and so on), but not of
+    utf-16 or shift_jis, for instance.
+    """
+    special = '\r\n,;:|\t"\' '
+
+    try:
+        if codecs.lookup(encoding).name == 'utf-8-sig':
+            return True
+        if special.encode(encoding) != special.encode('ascii'):
+            return False
+    except (LookupError, UnicodeError):
+        return False
+
+    high = bytes(bytearray(range(128, 256)))
+    return len(high.decode(encoding, 'replace')) == 128
+
+
+def chunk_offsets(f, chunk_size, quotechar=b'"', block_size=BLOCK_SIZE):
+    """Work out where to split a csv file into chunks of roughly
+    `chunk_size` bytes, so that every chunk starts at the beginning of a
+    record. Returns a list of byte offsets, starting with the current
+    position of f and ending with the end of the file.
+
+    Newlines inside quoted fields are taken care of by keeping track of
+    the number of quote characters seen so far: a newline only ends a
+    record if it comes after an even number of them. That's correct for
+    any dialect that escapes quotes by doubling them (the default), but
+    not for dialects that use an escapechar instead.
+
+    f should be a file opened in binary mode.
+    """
+    pos = f.tell()
+    offsets = [pos]
+    target = pos + chunk_size
+    quoted = False
+
+    while True:
+        block = f.read(block_size)
+
+        if not block:
+            break
+
+        end = pos + len(block)
+        i = 0
+        q = quoted
+
+        while target < end:
+            k = target - pos
+
+            if k > i:
+                if quotechar:
+                    q ^= block.count(quotechar, i, k) % 2 == 1
+                i = k
+
+            j = block.find(b'\n', i)
+
+            if j == -1:
+                break
+
+            if quotechar:
+                q ^= block.count(quotechar, i, j) % 2 == 1
+            i = j + 1
+
+            if not q:
+                offsets.append(pos + i)
+                target = pos + i + chunk_size
+
+        if quotechar:
+            q ^= block.count(quotechar, i) % 2 == 1
+
+        quoted = q
+        pos = end
+
+    if offsets[-1] != pos:
+        offsets.append(pos)
+    return offsets
+
+
+def read_record(f, quotechar=b'"'):
+    """Read a single record from a binary file, returning its raw bytes
+    (including the line ending). Returns empty bytes at the end of the
+    file. Quotes are counted in the same way as for chunk_offsets.
+    """
+    lines = []
+    quoted = False
+
+    while True:
+        line = f.readline()
+
+        if not line:
+            break
+        lines.append(line)
+
+        if quotechar and line.count(quotechar) % 2 == 1:
+            quoted = not quoted
+
+        if not quoted:
+            break
+    return b''.join(lines)
+
+
+def iter_records(f, quotechar=b'"'):
+    """Iterate over the raw bytes of each record in a binary file, from its
+    current position. Quotes are counted in the same way as for
+    chunk_offsets.
+    """
+    pending = []
+    quoted = False
+
+    for line in f:
+        if quotechar and quotechar in line and \
+                line.count(quotechar) % 2 == 1:
+            quoted = not quoted
+
+        if quoted:
+            pending.append(line)
+            continue
+
+        if pending:
+            pending.append(line)
+            line = b''.join(pending)
+            pending = []
+        yield line
+
+    if pending:
+        yield b''.join(pending)
+
+
+class RecordSplitter(object):
+    """Splits data arriving in pieces (bytes, or text if quotechar and
+    newline are text) into complete records: each one ends with a newline
+    that isn't inside quotes. Quotes are counted in the same way as for
+    chunk_offsets. Whatever follows the last complete record is kept as
+    `pending` until more data completes it.
+
+    Only the data added since the last call is scanned, so a long record
+    arriving in lots of small pieces doesn't get scanned over and over.
+    """
+
+    def __init__(self, quotechar=b'"', newline=b'\n'):
+        self.quotechar = quotechar
+        self.newline = newline
+        self.pending = newline[:0]
+        self.scanned = 0  # how much of pending has been looked at
+        self.quoted = False  # whether that much of it ends inside quotes
+
+    def split(self, data):
+        """Add some data to what's pending, and return a list of the
+        complete records there are now.
+        """
+        data = self.pending + data
+        q = self.quotechar
+        newline = self.newline
+        quoted = self.quoted
+        records = []
+        start = 0
+        i = self.scanned
+
+        while True:
+            j = data.find(newline, i)
+
+            if j == -1:
+                break
+
+            if q:
+                quoted ^= data.count(q, i, j) % 2 == 1
+            i = j + 1
+
+            if not quoted:
+                records.append(data[start:i])
+                start = i
+
+        self.pending = data[start:]
+        self.scanned = i - start
+        self.quoted = quoted
+        return records
+
+
+def is_blank(record):
+    return record == b'\n' or record == b'\r\n'
@@ -0,0 +1,186 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from operator import itemgetter
+
+import six
+
+from .conversion import converter
+
+
+def column_indexes(columns, fieldnames):
+    """Turn a list of columns, given by name or by position, into a list
+    of positions. Negative positions count back from the end of
+    fieldnames.
+    """
+    indexes = []
+
+    for c in columns:
+        if isinstance(c, int):
+            if c < 0 and c + len(fieldnames) < 0:
+                raise KeyError('no such column: {!r}'.format(c))
+            indexes.append(c + len(fieldnames) if c < 0 else c)
+        elif c in fieldnames:
+            indexes.append(fieldnames.index(c))
+        else:
+            raise KeyError('no such column: {!r}'.format(c))
+    return indexes
+
+
+def projection(indexes, missing=None):
+    """Returns a function that picks the values at the given positions out
+    of a row, as a list. Values missing from short rows are filled in with
+    `missing`, and blank rows are left blank.
+    """
+    indexes = list(indexes)
+    needed = max(indexes) + 1 if indexes else 0
+
+    if not indexes:
+        def pick(row):
+            return []
+    elif len(indexes) == 1:
+        i = indexes[0]
+
+        def pick(row):
+            return [row[i]]
+    else:
+        getter = itemgetter(*indexes)
+
+        def pick(row):
+            return list(getter(row))
+
+    def project(row):
+        if len(row) >= needed:
+            return pick(row)
+
+        if not row:
+            return row
+        return [row[i] if i < len(row) else missing for i in indexes]
+
+    return project
+
+
+def between(low=None, high=None, type=None):
+    """A condition for `where`, matching values from low to high,
+    inclusive. Either end can be left out.
+
+    Values are converted to the type of low and high before comparing, or
+    to the type you give (as per TypedReader: 'int', 'float', 'datetime'
+    and so on, or the types themselves). Values that are empty, missing or
+    can't be converted don't match.
+
+        where={'amount': between(100, 200)}
+        where={'amount': between(100, 200, type=float)}
+        where={'name': between('A', 'M')}
+    """
+    if type is None:
+        bound = low if low is not None else high
+        type = bound.__class__
+
+    convert = converter(type)
+
+    def test(value):
+        if value is None:
+            return False
+
+        if convert is not None:
+            try:
+                value = convert(value)
+            except ValueError:
+                return False
+
+            if value is None:
+                return False
+
+        if low is not None and value < low:
+            return False
+        if high is not None and value > high:
+            return False
+        return True
+
+    return test
+
+
+def condition_test(condition):
+    """Turn a single condition into a function that tests a value.
+    """
+    if hasattr(condition, 'search'):  # a compiled regular expression
+        def test(value):
+            return value is not None and \
+                condition.search(value) is not None
+        return test
+
+    if callable(condition):
+        return condition
+
+    if isinstance(condition, (set, frozenset, list, tuple)):
+        return frozenset(text(x) for x in condition).__contains__
+
+    expected = text(condition)
+
+    def test(value):
+        return value == expected
+
+    return test
+
+
+def text(x):
+    if isinstance(x, six.binary_type):
+        return x.decode('utf-8')
+    if isinstance(x, six.text_type):
+        return x
+    return six.text_type(x)
+
+
+def compile_where(where, fieldnames):
+    """Compile a `where` option into a function that takes a raw row (a
+    list of text values, as it comes from the stdlib reader) and returns
+    whether it matches.
+
+    `where` is a mapping of column (name or position) to condition. A row
+    matches if all the conditions match. Conditions can be:
+
+        - a single value: the field must equal it (as text).
+        - a set, list or tuple: the field must be one of the values.
+        - a compiled regular expression: it must match somewhere in the
+          field (use ^ and $ to match the whole thing).
+        - a function, called with the field (or None if the row is too
+          short to have it), which returns whether it matches. See
+          `between`, for ranges.
+
+    Column names are looked up once. If every condition is a plain value,
+    the fields are compared all at once with a single itemgetter call.
+    """
+    columns = list(where)
+    indexes = column_indexes(columns, fieldnames)
+    tests = [(i, condition_test(where[c])) for i, c in zip(indexes, columns)]
+
+    needed = max(indexes) + 1 if indexes else 0
+
+    plain = [c for c in columns
+             if not callable(where[c]) and not hasattr(where[c], 'search') and
+             not isinstance(where[c], (set, frozenset, list, tuple))]
+
+    if len(plain) == len(columns) and len(columns) > 1:
+        getter = itemgetter(*indexes)
+        expected = tuple(text(where[c]) for c in columns)
+
+        def matches(row):
+            return getter(row) == expected
+    else:
+        def matches(row):
+            for i, test in tests:
+                if not test(row[i]):
+                    return False
+            return True
+
+    def predicate(row):
+        if len(row) >= needed:
+            return matches(row)
+
+        for i, test in tests:
+            if not test(row[i] if i < len(row) else None):
+                return False
+        return True
+
+    return predicate
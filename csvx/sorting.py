@@ -0,0 +1,262 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import deque
+import csv
+import heapq
+from itertools import count
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from .conversion import converter, type_name
+from .csv import Reader, Writer
+from .records import dialect_params
+from .selection import column_indexes
+
+MEMORY = 256 * 1024 * 1024
+MAX_MERGE = 64
+
+# rough number of bytes of memory a row takes up, on top of its text
+ROW_OVERHEAD = 120
+VALUE_OVERHEAD = 60
+
+
+class Descending(object):
+    """Wraps a sort key to reverse its order, while keeping sorts stable
+    (unlike negating numbers, this works for any type).
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __gt__(self, other):
+        return other.key > self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __ne__(self, other):
+        return self.key != other.key
+
+
+class SortKey(object):
+    """The sort key for a row: the values of the key columns, converted to
+    their types. Empty and missing values sort first. A class rather than a
+    closure so that it can be sent to other processes.
+    """
+
+    def __init__(self, indexes, types, reverse=False):
+        self.indexes = indexes
+        self.types = types
+        self.reverse = reverse
+        self.setup()
+
+    def setup(self):
+        self.converters = [converter(t) for t in self.types]
+        self.parts = list(zip(self.indexes, self.converters))
+
+    def __getstate__(self):
+        return self.indexes, self.types, self.reverse
+
+    def __setstate__(self, state):
+        self.indexes, self.types, self.reverse = state
+        self.setup()
+
+    def __call__(self, row):
+        key = []
+
+        for i, convert in self.parts:
+            x = row[i] if i < len(row) else None
+
+            if convert is not None and x is not None:
+                x = convert(x)
+            key.append((x is not None, x))
+
+        key = tuple(key)
+        return Descending(key) if self.reverse else key
+
+
+def write_run(job):
+    rows, path, key, params = job
+    rows.sort(key=key)
+
+    with Writer(path, **params) as w:
+        w.write_rows(rows)
+    return path
+
+
+def row_size(row):
+    return ROW_OVERHEAD + sum(len(x) + VALUE_OVERHEAD for x in row)
+
+
+def merge_runs(paths, key, params):
+    """Merge sorted runs, keeping rows with equal keys in run order.
+    """
+    def decorated(path, run):
+        with Reader(path, compression=None, **params) as r:
+            for n, row in enumerate(r):
+                yield key(row), run, n, row
+
+    merged = heapq.merge(*[decorated(path, run)
+                           for run, path in enumerate(paths)])
+
+    for k, run, n, row in merged:
+        yield row
+
+
+def sort(in_path, out_path, key, types=None, reverse=False, memory=MEMORY,
+         workers=None, header=True, tmpdir=None, dialect=csv.excel, **kw):
+    """Sort a csv file by one or more columns, without needing to fit the
+    file in memory.
+
+    The file is read in chunks of roughly `memory` bytes. Each chunk is
+    sorted and written out to a temporary file, and the sorted chunks are
+    then merged together into the output. A file that fits in memory is
+    simply sorted and written out.
+
+    The sort is stable: rows with equal keys stay in their original
+    order. Blank lines are dropped.
+
+    Args:
+        in_path: The file to sort.
+        out_path: Where to write the sorted rows.
+        key: The column (or list of columns) to sort by, given by name, or
+            by position if the file has no header.
+        types: A mapping of key column to type (as per TypedReader: 'int',
+            'float', 'datetime' and so on). Columns are sorted as text
+            otherwise. Empty values sort first.
+        reverse: Sort in descending order.
+        memory: Roughly how many bytes of rows to hold in memory at once.
+            With workers, each worker can hold a chunk of this size as
+            well, on top of the one being read.
+        workers: If set, chunks are sorted and written out by a pool of
+            this many processes, while the next chunk is read.
+        header: Whether the file has a header row, which is kept at the
+            top of the output.
+        tmpdir: Where to put the temporary files. Defaults to the system
+            temporary directory.
+        dialect, kw: As for Reader and Writer.
+        encoding: The encoding of the file, which the output is written in
+            too.
+
+    Returns the number of rows written, not counting the header.
+    """
+    if not isinstance(key, (list, tuple)):
+        key = [key]
+    types = types or {}
+
+    # every file (input, output and runs) is read and written in the same
+    # encoding, which Writer takes as an argument rather than passing it
+    # on to the csv module
+    encoding = kw.pop('encoding', None)
+    params = dict(dialect_params(dialect, kw), encoding=encoding)
+    tmp = tempfile.mkdtemp(prefix='csvx-sort-', dir=tmpdir)
+    pool = multiprocessing.Pool(workers) if workers else None
+
+    try:
+        with Reader(in_path, **params) as r:
+            fieldnames = list(next(r, [])) if header else []
+            indexes = column_indexes(key, fieldnames)
+
+            names = [fieldnames[i] if header else i for i in indexes]
+            column_types = [type_name(types.get(n)) for n in names]
+            sort_key = SortKey(indexes, column_types, reverse)
+
+            runs, total = write_runs(r, sort_key, memory, params, tmp, pool,
+                                     workers)
+
+        with Writer(out_path, **params) as w:
+            if header:
+                w.write_row(fieldnames)
+
+            if len(runs) == 1:
+                with Reader(runs[0], compression=None, **params) as r:
+                    w.write_rows(r)
+            else:
+                def merge(paths):
+                    return merge_runs(paths, sort_key, params)
+
+                def write(rows, path):
+                    with Writer(path, compression=None, **params) as run:
+                        run.write_rows(rows)
+
+                runs = reduce_runs(runs, merge, write, tmp)
+                w.write_rows(merge(runs))
+        return total
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def write_runs(rows, key, memory, params, tmp, pool, workers):
+    """Split the rows into chunks that fit in memory, sort them, and write
+    each one out to a temporary file. With a pool, at most `workers`
+    chunks are being sorted at once: reading waits for the oldest one to
+    finish before handing over another, so memory use stays bounded.
+    """
+    runs = []
+    waiting = deque()
+    chunk = []
+    size = 0
+    total = 0
+    names = count()
+
+    def flush(chunk):
+        path = os.path.join(tmp, 'run-{}.csv'.format(next(names)))
+        job = (chunk, path, key, params)
+
+        if pool is None:
+            runs.append(write_run(job))
+            return
+
+        while len(waiting) >= workers:
+            runs.append(waiting.popleft().get())
+        waiting.append(pool.apply_async(write_run, (job,)))
+
+    for row in rows:
+        if not row:
+            continue
+
+        chunk.append(row)
+        size += row_size(row)
+        total += 1
+
+        if size >= memory:
+            flush(chunk)
+            chunk = []
+            size = 0
+
+    if chunk or not (runs or waiting):
+        flush(chunk)
+
+    runs.extend(result.get() for result in waiting)
+    return runs, total
+
+
+def reduce_runs(runs, merge, write, tmp):
+    """Merge runs together until there are few enough of them to merge
+    all at once without running out of file handles. merge(paths) merges
+    some runs, and write(items, path) writes the merged items out as a new
+    run.
+    """
+    names = count()
+
+    while len(runs) > MAX_MERGE:
+        merged = []
+
+        for i in range(0, len(runs), MAX_MERGE):
+            path = os.path.join(tmp, 'merged-{}'.format(next(names)))
+            write(merge(runs[i:i + MAX_MERGE]), path)
+            merged.append(path)
+        runs = merged
+    return runs
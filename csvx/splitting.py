@@ -0,0 +1,172 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import csv
+import io
+import zlib
+
+from .compression import detect_compression
+from .csv import reader
+from .records import dialect_params, is_blank, iter_records, quote_character, \
+    read_record
+from .selection import column_indexes
+
+COPY_SIZE = 1024 * 1024
+
+
+def plain_file(path):
+    if detect_compression(path):
+        raise ValueError('{} is compressed: split and concat copy raw '
+                         'bytes, so only work on plain files'.format(path))
+
+
+def parse_record(record, encoding, params):
+    return list(next(reader([record.decode(encoding)], **params), []))
+
+
+def split(path, out, rows=None, size=None, key=None, parts=None,
+          header=True, encoding='utf-8', dialect=csv.excel, **kw):
+    """Split a csv file into parts, each with the header row repeated at
+    the top (if there is one).
+
+    Records are copied across as raw bytes, without being parsed (except
+    to get at the key, when splitting by key). Newlines inside quoted
+    fields are taken care of, as long as quotes are escaped by doubling
+    them (the default).
+
+    Args:
+        path: The file to split. It has to be a plain, uncompressed file.
+        out: The name of each part, with {} where the part number (from 0)
+            goes, for instance 'part-{}.csv'.
+        rows: Start a new part after this many rows.
+        size: Start a new part before it goes over this many bytes
+            (header included). A part always gets at least one row, even
+            if that row is bigger on its own.
+        key, parts: Split into `parts` parts by a hash of the key column,
+            so that all the rows with the same key end up in the same part.
+        header: Whether the file has a header row.
+        encoding: The encoding of the file (only used to read the key).
+        dialect, kw: As for Reader.
+
+    Exactly one of rows, size or key needs to be given. Returns the list of
+    file names written.
+    """
+    if sum(x is not None for x in (rows, size, key)) != 1:
+        raise ValueError('give one of rows, size or key')
+    if key is not None and not parts:
+        raise ValueError('splitting by key needs a number of parts')
+
+    plain_file(path)
+    params = dialect_params(dialect, kw)
+    quotechar = quote_character(params)
+    quotechar = quotechar.encode(encoding) if quotechar else None
+
+    with io.open(path, 'rb') as f:
+        head = read_record(f, quotechar) if header else b''
+        records = (r for r in iter_records(f, quotechar) if not is_blank(r))
+
+        if key is not None:
+            fieldnames = parse_record(head, encoding, params) if header \
+                else []
+            index = column_indexes([key], fieldnames)[0]
+            return split_by_key(records, out, head, index, parts, encoding,
+                                params)
+        return split_by_size(records, out, head, rows, size)
+
+
+def split_by_size(records, out, head, rows, size):
+    paths = []
+    part = None
+    count = length = 0
+
+    try:
+        for record in records:
+            full = part is not None and (
+                count >= rows if rows is not None
+                else length + len(record) > size)
+
+            if part is None or full:
+                if part is not None:
+                    part.close()
+
+                paths.append(out.format(len(paths)))
+                part = io.open(paths[-1], 'wb')
+                part.write(head)
+                count, length = 0, len(head)
+
+            part.write(record)
+            count += 1
+            length += len(record)
+    finally:
+        if part is not None:
+            part.close()
+    return paths
+
+
+def split_by_key(records, out, head, index, parts, encoding, params):
+    paths = [out.format(i) for i in range(parts)]
+    files = []
+
+    try:
+        for p in paths:
+            files.append(io.open(p, 'wb'))
+            files[-1].write(head)
+
+        for record in records:
+            row = parse_record(record, encoding, params)
+            value = row[index] if index < len(row) else ''
+            h = zlib.crc32(value.encode('utf-8')) & 0xffffffff
+            files[h % parts].write(record)
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def concat(paths, out, header=True, encoding='utf-8', dialect=csv.excel,
+           **kw):
+    """Join csv files (such as the parts from split) back together into
+    one, keeping only the first file's header row. Raises ValueError if a
+    file's header doesn't match the first one.
+
+    The files are copied as raw bytes, so they need to be plain,
+    uncompressed files. A file that doesn't end with a newline gets one
+    added.
+    """
+    params = dialect_params(dialect, kw)
+    quotechar = quote_character(params)
+    quotechar = quotechar.encode(encoding) if quotechar else None
+    newline = params.get('lineterminator', '\r\n').encode(encoding)
+    fieldnames = None
+
+    with io.open(out, 'wb') as o:
+        last = b'\n'
+
+        for i, path in enumerate(paths):
+            plain_file(path)
+
+            with io.open(path, 'rb') as f:
+                if header:
+                    head = read_record(f, quotechar)
+                    names = parse_record(head, encoding, params)
+
+                    if fieldnames is None:
+                        fieldnames = names
+                        o.write(head)
+                        last = head[-1:] or last
+                    elif names != fieldnames:
+                        raise ValueError(
+                            'the header of {} ({!r}) is different to the '
+                            'first file\'s ({!r})'.format(
+                                path, names, fieldnames))
+
+                if last != b'\n':
+                    o.write(newline)
+                    last = b'\n'
+
+                while True:
+                    block = f.read(COPY_SIZE)
+                    if not block:
+                        break
+                    o.write(block)
+                    last = block[-1:]
@@ -0,0 +1,160 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import deque, namedtuple
+import csv
+import io
+import time
+
+from .compression import is_path
+from .csv import reader
+from .records import BLOCK_SIZE, RecordSplitter, ascii_compatible, \
+    dialect_params, quote_character
+
+
+class Checkpoint(namedtuple('Checkpoint', 'offset header')):
+    """Where a TailReader got up to: the byte offset just after the last
+    row it returned, and the header row (or None). Pass it to a new
+    TailReader to carry on from there. It's a plain tuple, so it can be
+    saved as json.
+    """
+
+    __slots__ = ()
+
+
+class TailReader(object):
+    """Reads rows from a csv file that's being appended to, and keeps track
+    of its byte position so that reading can pick up again later.
+
+    Only complete records (ending with a newline) are returned. A partial
+    record at the end of the file is held back until the rest of it has
+    been written.
+
+    Args:
+        f: The file name, or a file opened in binary mode.
+        dialect, kw: As for Reader.
+        header: Whether the file starts with a header row. If so, it's
+            read first and kept as `fieldnames`, rather than returned.
+        checkpoint: A Checkpoint (or a (offset, header) pair, as saved
+            from one) to start from, instead of the start of the file.
+        follow: Keep waiting for more rows at the end of the file, like
+            tail -f, instead of stopping.
+        interval: How long to wait between looks at the file, in seconds,
+            when following.
+        timeout: When following, stop after this many seconds without any
+            new rows. By default, follow forever.
+        encoding: The encoding of the file, which has to be
+            ascii-compatible (see records.ascii_compatible), since records
+            are found by looking for newlines and quotes in the raw bytes.
+
+    Iterate over it to get the rows as lists, and save `checkpoint`
+    afterwards to resume from.
+
+    Line endings of just '\\r' aren't supported, and quotes are assumed to be
+    escaped by doubling them (the default).
+    """
+
+    def __init__(self, f, dialect=csv.excel, header=True, checkpoint=None,
+                 follow=False, interval=1.0, timeout=None, encoding='utf-8',
+                 **kw):
+        if not ascii_compatible(encoding):
+            raise ValueError('TailReader needs an ascii-compatible encoding, '
+                             'not {!r}'.format(encoding))
+
+        self.params = dialect_params(dialect, kw)
+        quotechar = quote_character(self.params)
+        quotechar = quotechar.encode(encoding) if quotechar else None
+        self.splitter = RecordSplitter(quotechar)
+
+        self.encoding = encoding
+        self.follow = follow
+        self.interval = interval
+        self.timeout = timeout
+
+        self.path = f if is_path(f) else None
+        self.f = io.open(f, 'rb') if self.path else f
+
+        if checkpoint is not None:
+            offset, fieldnames = checkpoint
+            self.f.seek(offset)
+            self.offset = offset
+            self.fieldnames = list(fieldnames) if fieldnames else None
+            self.want_header = header and not fieldnames
+        else:
+            self.offset = self.f.tell()
+            self.fieldnames = None
+            self.want_header = header
+
+        self.rows = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def close(self):
+        if self.path:
+            self.f.close()
+
+    def __iter__(self):
+        return self
+
+    @property
+    def checkpoint(self):
+        return Checkpoint(self.offset, self.fieldnames)
+
+    def fill(self):
+        """Read the file a block at a time until there are complete records
+        to parse, and queue up their rows. Returns True if there are rows
+        ready, or False at the end of the file. A partial record at the end
+        of a block is kept until the next block completes it.
+        """
+        while not self.rows:
+            data = self.f.read(BLOCK_SIZE)
+
+            if not data:
+                return False
+
+            records = self.splitter.split(data)
+
+            if not records:
+                continue
+
+            encoding = self.encoding
+            texts = [r.decode(encoding) for r in records]
+            parsed = reader(iter(texts), **self.params)
+
+            for record, row in zip(records, parsed):
+                self.rows.append((row, len(record)))
+
+            if self.want_header:
+                while self.rows and self.fieldnames is None:
+                    row, size = self.rows.popleft()
+                    self.offset += size
+
+                    if row:
+                        self.fieldnames = list(row)
+                self.want_header = self.fieldnames is None
+        return True
+
+    def next(self):
+        waited = 0
+
+        while True:
+            while self.rows or self.fill():
+                row, size = self.rows.popleft()
+                self.offset += size
+
+                if row:
+                    return list(row)
+
+            if not self.follow:
+                raise StopIteration
+            if self.timeout is not None and waited >= self.timeout:
+                raise StopIteration
+
+            time.sleep(self.interval)
+            waited += self.interval
+
+    __next__ = next
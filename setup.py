@@ -20,6 +20,11 @@ setup(
         'six'
     ],
     packages=find_packages(),
+    entry_points={
+        'console_scripts': [
+            'csvx = csvx.cli:main'
+        ]
+    },
     classifiers=[
         'Development Status :: 3 - Alpha'
     ]
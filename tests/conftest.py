@@ -0,0 +1,6 @@
+import six
+
+collect_ignore = []
+
+if six.PY2:
+    collect_ignore.append('unit/test_aio.py')
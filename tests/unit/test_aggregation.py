@@ -0,0 +1,76 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import csvx
+from csvx import Writer
+from csvx.aggregation import ApproxDistinct
+
+import pytest
+
+ROWS = [['shop', 'item', 'price']] + \
+    [['shop {}'.format(i % 3), 'item {}'.format(i % 10),
+      str(i % 7) if i % 11 else ''] for i in range(300)]
+
+
+def expected():
+    groups = {}
+
+    for shop, item, price in ROWS[1:]:
+        g = groups.setdefault(shop, {'rows': 0, 'prices': [], 'items': set()})
+        g['rows'] += 1
+        g['items'].add(item)
+        if price:
+            g['prices'].append(int(price))
+    return groups
+
+
+@pytest.mark.parametrize('max_groups', [None, 1, 2])
+def test_aggregate(tmpdir, monkeypatch, max_groups):
+    monkeypatch.setattr('csvx.sorting.MAX_MERGE', 2)  # merge in passes
+    path = str(tmpdir / 'test.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS)
+
+    results = list(csvx.aggregate(path, 'shop', {
+        'rows': 'count',
+        'prices': ('count', 'price'),
+        'total': ('sum', 'price'),
+        'mean': ('mean', 'price'),
+        'cheapest': ('min', 'price'),
+        'dearest': ('max', 'price'),
+        'items': ('distinct', 'item'),
+        'approx_items': ('approx_distinct', 'item'),
+    }, types={'price': int}, max_groups=max_groups))
+
+    assert [r['shop'] for r in results] == ['shop 0', 'shop 1', 'shop 2']
+
+    for r in results:
+        g = expected()[r['shop']]
+        assert r['rows'] == g['rows']
+        assert r['prices'] == len(g['prices'])
+        assert r['total'] == sum(g['prices'])
+        assert r['mean'] == sum(g['prices']) / len(g['prices'])
+        assert r['cheapest'] == min(g['prices'])
+        assert r['dearest'] == max(g['prices'])
+        assert r['items'] == r['approx_items'] == len(g['items'])
+
+    results = list(csvx.aggregate(path, ['shop', 'item'], {'n': 'count'},
+                                  where={'shop': 'shop 1'}))
+    assert len(results) == 10
+    assert sum(r['n'] for r in results) == 100
+
+    with pytest.raises(ValueError):
+        list(csvx.aggregate(path, 'shop', {'n': ('median', 'price')}))
+
+
+def test_approx_distinct():
+    a, b = ApproxDistinct(), ApproxDistinct()
+
+    for i in range(20000):
+        a.add(i)
+        b.add(i + 10000)
+
+    assert abs(a.result() - 20000) < 20000 * 0.05
+    a.merge(b)
+    assert abs(a.result() - 30000) < 30000 * 0.05
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from csvx import AsyncReader, AsyncDictReader, AsyncWriter, \
+    AsyncDictWriter, OrderedDictReader, Reader, Writer
+
+import asyncio
+import io
+
+ROWS = [['id', 'text', 'amount']] + \
+    [[str(i), 'François "quoted",\nover two lines' if i % 3 else 'plain',
+      str(i * 1.5)] for i in range(200)]
+
+
+class ByteStream(object):
+    def __init__(self, data, most):
+        self.f = io.BytesIO(data)
+        self.most = most
+
+    async def read(self, n):
+        return self.f.read(min(n, self.most))
+
+
+class Sink(object):
+    def __init__(self):
+        self.written = []
+        self.drained = 0
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        self.drained += 1
+
+
+async def read_all(r):
+    rows = []
+
+    async with r:
+        async for row in r:
+            rows.append(row)
+    return rows
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_async_reader_and_writer(tmpdir):
+    path = str(tmpdir / 'test.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS)
+
+    with io.open(path, 'rb') as f:
+        data = f.read()
+
+    with OrderedDictReader(path) as r:
+        dicts = list(r)
+
+    for most in (1, 7, 1000):
+        r = AsyncReader(ByteStream(data, most), read_size=100)
+        assert run(read_all(r)) == ROWS
+
+    r = AsyncDictReader(ByteStream(data, 100))
+    assert run(read_all(r)) == dicts
+
+    async def write():
+        sink = Sink()
+
+        async with AsyncWriter(sink) as w:
+            await w.write_rows(ROWS[:-1], batch_size=50)
+            await w.write_row(ROWS[-1])
+            assert w.row_count == len(ROWS)
+        assert sink.drained == 5
+        return b''.join(sink.written)
+
+    assert run(write()) == data
+
+    async def write_dicts():
+        sink = Sink()
+
+        async with AsyncDictWriter(sink) as w:
+            await w.write_dicts(dicts[:-1])
+            await w.write_dict(dicts[-1])
+        return b''.join(sink.written)
+
+    assert run(write_dicts()) == data
+
+
+def test_quoted_newlines_kept(tmpdir):
+    # the same data as in test_parallel, which the sync readers have to
+    # agree on too
+    path = str(tmpdir / 'test.csv')
+    data = b'1,"x\r\ny"\r\n2,"a\rb"\r\n'
+
+    with io.open(path, 'wb') as f:
+        f.write(data)
+
+    with Reader(path) as r:
+        expected = list(r)
+
+    assert expected == [['1', 'x\r\ny'], ['2', 'a\rb']]
+
+    for most in (1, 3, 1000):
+        r = AsyncReader(ByteStream(data, most))
+        assert run(read_all(r)) == expected
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from csvx import ColumnReader, to_str
+
+from array import array
+import math
+
+import pytest
+from six import StringIO as sio
+
+TEXT = 'id,name,amount,other\n1,François,1.5,x\n2,Bob,,y\n3,Jo\n'
+
+
+def test_column_reader():
+    with ColumnReader(sio(to_str(TEXT)), columns=['amount', 'id', 'name'],
+                      types={'id': int, 'amount': float}, batch_size=2) as r:
+        assert r.fieldnames == ['id', 'name', 'amount', 'other']
+        columns = r.read()
+
+    assert list(columns) == ['amount', 'id', 'name']
+    assert columns['id'] == array(columns['id'].typecode, [1, 2, 3])
+    assert columns['amount'][0] == 1.5
+    assert math.isnan(columns['amount'][1])
+    assert math.isnan(columns['amount'][2])
+    assert columns['name'] == ['François', 'Bob', 'Jo']
+
+    with ColumnReader(sio(to_str(TEXT))) as r:
+        assert r.read()['other'] == ['x', 'y', '']
+
+    with pytest.raises(KeyError):
+        ColumnReader(sio(to_str(TEXT)), columns=['nope'])
+
+    with ColumnReader(sio(to_str(TEXT)), columns=['other'],
+                      types={'other': int}) as r:
+        with pytest.raises(ValueError):
+            r.read()
+
+
+def test_infer_blanks():
+    text = to_str('a,b\n1,x\n\n,y\n3,z\n')
+
+    with ColumnReader(sio(text), types='infer') as r:
+        columns = r.read()
+
+    assert r.types == {'a': 'float', 'b': 'text'}
+    assert columns['a'][0] == 1 and columns['a'][2] == 3
+    assert math.isnan(columns['a'][1])
+    assert columns['b'] == ['x', 'y', 'z']
+
+    with ColumnReader(sio(to_str('a\n1\n\n2\n')), types='infer') as r:
+        assert list(r.read()['a']) == [1, 2]
+        assert r.types == {'a': 'int'}
+
+
+def test_conversion_errors():
+    text = to_str('a,b\n1,x\n2,y\n\n{},z\n'.format(2 ** 70))
+
+    with ColumnReader(sio(text), types='infer', batch_size=2) as r:
+        with pytest.raises(ValueError, match="column u?'a', row 3"):
+            r.read()
+
+    with ColumnReader(sio(text), types={'b': 'int'}) as r:
+        with pytest.raises(ValueError, match="column u?'b', row 1"):
+            r.read()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from csvx import TypedReader, ColumnReader, sniff_text, to_str
+from csvx.conversion import infer_type, converter
+
+from datetime import date, datetime
+import math
+
+import pytest
+from six import StringIO as sio
+
+TEXT = (
+    'id,active,start_time,end_time,amount,day,name\n'
+    '490,False,2012-10-01 00:00:00.000000,2013-01-02 00:00:00,72000000,'
+    '2012-10-01,François\n'
+    '491,true,2012-10-02 00:00:00.500000,-infinity,-infinity,,Bob\n'
+)
+
+
+def test_infer_type():
+    assert infer_type(['1', '', '-2']) == 'int'
+    assert infer_type(['1', '2.5', '-infinity']) == 'float'
+    assert infer_type(['False', 'TRUE']) == 'bool'
+    assert infer_type(['2012-10-01 00:00:00', '-infinity']) == 'text'
+    assert infer_type(['', '']) == 'text'
+    assert converter('int')('') is None
+    assert converter('text') is None
+
+
+def test_typed_reader():
+    with TypedReader(sio(to_str(TEXT)), types={'name': 'text'}) as r:
+        assert list(r.types.values()) == [
+            'int', 'bool', 'datetime', 'text', 'float', 'date', 'text']
+        first, second = list(r)
+
+    assert first['id'] == 490
+    assert first['active'] is False
+    assert first['start_time'] == datetime(2012, 10, 1)
+    assert first['amount'] == 72000000.0
+    assert first['day'] == date(2012, 10, 1)
+    assert first['name'] == 'François'
+    assert second['active'] is True
+    assert second['start_time'] == datetime(2012, 10, 2, 0, 0, 0, 500000)
+    assert second['end_time'] == '-infinity'
+    assert second['amount'] == float('-inf')
+    assert second['day'] is None
+
+    with TypedReader(sio(to_str(TEXT)), sample_size=1) as r:
+        assert r.types['end_time'] == 'datetime'
+
+        with pytest.raises(ValueError, match="column u?'end_time', row 2"):
+            list(r)
+
+    with TypedReader(sio(to_str('a,b\n1,x\n2,y\nz,x\n')),
+                     sample_size=2) as r:
+        with pytest.raises(ValueError, match="column u?'a', row 3"):
+            list(r.iter_batches(10, columnar=True))
+
+    sniffed = sniff_text(TEXT, types=True)
+    assert sniffed.delimiter == ','
+    assert list(sniffed.types.values()) == [
+        'int', 'bool', 'datetime', 'text', 'float', 'date', 'text']
+
+
+def test_column_reader_types():
+    with ColumnReader(sio(to_str(TEXT)), types='infer') as r:
+        columns = r.read()
+
+    assert list(columns['id']) == [490, 491]
+    assert columns['active'] == [False, True]
+    assert math.isinf(columns['amount'][1])
+    assert columns['day'] == [date(2012, 10, 1), None]
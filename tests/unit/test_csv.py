@@ -1,13 +1,20 @@
+# -*- coding: utf-8 -*-
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from csvx import Reader, OrderedDictReader, Writer, DictWriter, \
-    to_text, to_str, ordereddicts_from_text, text_from_dicts, sniff_text
+from csvx import Reader, OrderedDictReader, NamedTupleReader, TypedReader, \
+    Writer, DictWriter, between, to_text, to_str, ordereddicts_from_text, \
+    text_from_dicts, sniff_text, sniff_file, sniff_stream
+from csvx.buffering import BufferedOutput
 
 from collections import OrderedDict
 import io
+import six
 from six import StringIO as sio
 import csv
+import re
+
+import pytest
 
 
 def unicode_list(t):
@@ -131,3 +138,321 @@ def test_csv(tmpdir):
         w.write_dicts(csvx_ordereddicts)
         csvx_out = csvx_out.getvalue()
     assert stdlib_out == csvx_out
+
+
+def test_write_rows_batched():
+    rows = [ROWS_FOR_WRITING[i % 3] for i in range(25)]
+
+    one_at_a_time = sio('')
+
+    with Writer(one_at_a_time) as w:
+        for row in rows:
+            w.write_row(iter(row))
+        w.flush()
+        one_at_a_time = one_at_a_time.getvalue()
+
+    batched = sio('')
+
+    with Writer(batched) as w:
+        w.write_rows((iter(row) for row in rows), batch_size=7)
+        assert w.row_count == 25
+        w.flush()
+        batched = batched.getvalue()
+
+    assert batched == one_at_a_time
+
+
+def test_namedtuple_reader(tmpdir):
+    path = str(tmpdir / 'test.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS_FOR_WRITING)
+
+    with NamedTupleReader(path) as r:
+        rows = list(r)
+
+    assert [list(row) for row in rows] == ROW_ROWS
+    assert rows[0]._asdict() == OrderedDict(zip(r.row_type._fields,
+                                                FIRST_ROW_U))
+    assert rows[0].id == '490'
+    assert rows[1].amount == '72000000'
+
+    t = 'a,b,c\n1\n\n1,2,3\n'
+
+    with NamedTupleReader(sio(to_str(t)), restval='') as r:
+        assert [tuple(row) for row in r] == [('1', '', ''), ('1', '2', '3')]
+
+    with NamedTupleReader(sio(to_str('a,b\n1,2,3\n'))) as r:
+        with pytest.raises(ValueError):
+            next(r)
+
+
+def test_sniff_file(tmpdir):
+    path = str(tmpdir / 'test.csv')
+
+    rows = [['id', 'name', 'amount']] + \
+        [[i, 'Fran\u00e7ois', i * 1.5] for i in range(2000)]
+
+    with io.open(path, 'w', encoding='utf-8-sig') as f:
+        with Writer(f, delimiter=';') as w:
+            w.write_rows(rows)
+
+    sniffed = sniff_file(path, sample_size=1000)
+    assert sniffed.delimiter == ';'
+    assert sniffed.has_header
+    assert sniffed.encoding == 'utf-8-sig'
+    assert list(sniffed.types.items()) == \
+        [('id', 'int'), ('name', 'text'), ('amount', 'float')]
+
+    with Reader(path, dialect=sniffed) as r:
+        assert list(r) == [unicode_list(row) for row in rows]
+
+    with io.open(path, 'rb') as f:
+        f.seek(3)
+        sniffed = sniff_stream(f, sample_size=1000, middle=True)
+        assert f.tell() == 3
+        assert sniffed.encoding == 'utf-8'
+        assert sniffed.delimiter == ';'
+
+    with io.open(path, encoding='utf-8-sig') as f:
+        assert sniff_stream(f, sample_size=1000).delimiter == ';'
+
+
+def test_dict_writer_fieldnames():
+    out = sio('')
+
+    with DictWriter(out, fieldnames=['a', 'b'], restval='?') as w:
+        w.write_dicts([{'a': 1, 'b': 2}, {b'b': b'x'}, {'a': None}],
+                      batch_size=2)
+        w.write_dict(OrderedDict([('b', 3), ('a', 4)]))
+
+        with pytest.raises(ValueError):
+            w.write_dict({'a': 1, 'c': 2})
+
+        assert w.row_count == 4
+        w.flush()
+        assert out.getvalue() == to_str('a,b\r\n1,2\r\n?,x\r\n,?\r\n4,3\r\n')
+
+    out = sio('')
+
+    with DictWriter(out, fieldnames=['a'], extrasaction='ignore') as w:
+        w.write_dict({'a': 1, 'c': 2})
+        w.flush()
+        assert out.getvalue() == to_str('a\r\n1\r\n')
+
+
+@pytest.mark.parametrize('ext', ['.gz', '.bz2', '.xz', '.zst'])
+def test_compression(tmpdir, ext):
+    if ext == '.xz' and six.PY2:
+        pytest.importorskip('backports.lzma')
+    if ext == '.zst':
+        pytest.importorskip('zstandard')
+
+    path = str(tmpdir / ('test.csv' + ext))
+
+    with Writer(path, compresslevel=1) as w:
+        w.write_rows(ROWS_FOR_WRITING)
+
+    with io.open(path, 'rb') as f:
+        assert b'490' not in f.read()
+
+    with Reader(path) as r:
+        assert list(r) == ALL_ROW_ROWS
+
+    # no extension: worked out from the first few bytes instead
+    renamed = str(tmpdir / 'renamed')
+    (tmpdir / ('test.csv' + ext)).rename(tmpdir / 'renamed')
+
+    with OrderedDictReader(renamed) as odr:
+        assert list(odr) == ROW_ODS
+
+    with DictWriter(path, fieldnames=COL_NAMES) as dw:
+        dw.write_dicts(ROW_ODS)
+
+    with OrderedDictReader(path) as odr:
+        assert list(odr) == ROW_ODS
+
+    if ext == '.bz2' and six.PY2:
+        return  # python 2's bz2 module only reads the first stream
+
+    # two compressed streams (or frames) one after the other
+    with io.open(path, 'rb') as f:
+        data = f.read()
+
+    with io.open(path, 'wb') as f:
+        f.write(data + data)
+
+    with Reader(path) as r:
+        assert list(r) == ALL_ROW_ROWS * 2
+
+
+def test_columns():
+    t = to_str('a,b,c\n1,2,3\n\n4\n5,6,7,8\n')
+
+    with Reader(sio(t), columns=['c', 'a']) as r:
+        assert list(r) == [['c', 'a'], ['3', '1'], [], [None, '4'],
+                           ['7', '5']]
+
+    with Reader(sio(t), columns=[1]) as r:
+        assert list(r) == [['b'], ['2'], [], [None], ['6']]
+
+    with Reader(sio(t), columns=[-1, 0]) as r:
+        assert list(r) == [['c', 'a'], ['3', '1'], [], [None, '4'],
+                           ['7', '5']]
+
+    with OrderedDictReader(sio(t), columns=['c', 'a'], restval='') as r:
+        assert r.fieldnames == ['c', 'a']
+        assert [list(od.items()) for od in r] == [
+            [('c', '3'), ('a', '1')],
+            [('c', ''), ('a', '4')],
+            [('c', '7'), ('a', '5')],
+        ]
+
+    with NamedTupleReader(sio(t), columns=['b']) as r:
+        assert [row.b for row in r] == ['2', None, '6']
+
+    with pytest.raises(KeyError):
+        Reader(sio(t), columns=['nope'])
+
+    with pytest.raises(KeyError):
+        Reader(sio(t), columns=[-4])
+
+
+def test_where():
+    t = to_str('name,amount,tag\nFred,10,a\nBob,200,b\nFranz,30\n\nJo,5,a\n')
+
+    def names(r):
+        return [row['name'] for row in r]
+
+    with OrderedDictReader(sio(t), where={'tag': 'a'}) as r:
+        assert names(r) == ['Fred', 'Jo']
+
+    with OrderedDictReader(sio(t), where={'tag': 'a', 'amount': 5}) as r:
+        assert names(r) == ['Jo']
+
+    with OrderedDictReader(sio(t), where={'tag': ['b', 'c']}) as r:
+        assert names(r) == ['Bob']
+
+    with OrderedDictReader(sio(t), where={'name': re.compile('^Fr')}) as r:
+        assert names(r) == ['Fred', 'Franz']
+
+    with OrderedDictReader(sio(t), where={'amount': between(10, 100)}) as r:
+        assert names(r) == ['Fred', 'Franz']
+
+    with OrderedDictReader(sio(t), where={'tag': lambda x: x is None}) as r:
+        assert names(r) == ['Franz']
+
+    with Reader(sio(t), where={'amount': between(100)},
+                columns=['name']) as r:
+        assert list(r) == [['name'], ['Bob']]
+
+    with TypedReader(sio(t), where={'amount': between('1', '4')}) as r:
+        assert [row['amount'] for row in r] == [10, 200, 30]
+
+
+def test_iter_batches():
+    t = to_str('a,b\n1,2\n\n3\n4,5,6\n7,8\n')
+
+    with Reader(sio(t)) as r:
+        assert list(r.iter_batches(2)) == [[['a', 'b'], ['1', '2']],
+                                           [[], ['3']],
+                                           [['4', '5', '6'], ['7', '8']]]
+
+    with Reader(sio(t)) as r:
+        assert list(r.iter_batches(4, columnar=True)) == [
+            [['a', '1', None, '3'], ['b', '2', None, None]],
+            [['4', '7'], ['5', '8'], ['6', None]]]
+
+    with OrderedDictReader(sio(t)) as r:
+        batches = [list(b) for b in r.iter_batches(3, reuse=True)]
+
+    with OrderedDictReader(sio(t)) as r:
+        rows = list(r)
+        assert batches == [rows[:3], rows[3:]]
+
+    with OrderedDictReader(sio(t), restval='') as r:
+        assert [list(b.items()) for b in r.iter_batches(2, True)] == [
+            [('a', ['1', '3']), ('b', ['2', ''])],
+            [('a', ['4', '7']), ('b', ['5', '8'])]]
+
+    with TypedReader(sio(t)) as r:
+        assert [list(b.values()) for b in r.iter_batches(10, True)] == \
+            [[[1, 3, 4, 7], [2, None, 5, 8]]]
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'latin-1', 'utf-16'])
+def test_encoding(tmpdir, encoding):
+    text = 'id,name\r\n1,"François,\nJr"\r\n2,é\r\n'
+    rows = [['id', 'name'], ['1', 'François,\nJr'], ['2', 'é']]
+    data = text.encode(encoding)
+
+    with Reader(io.BytesIO(data), encoding=encoding) as r:
+        assert list(r) == rows
+
+    path = str(tmpdir / 'test.csv')
+
+    with io.open(path, 'wb') as f:
+        f.write(data)
+
+    with OrderedDictReader(path, encoding=encoding) as r:
+        assert r.fieldnames == rows[0]
+        assert [list(row.values()) for row in r] == rows[1:]
+
+
+def test_writer_flush():
+    out = sio('')
+    w = Writer(out)
+    w.write_rows([['a', 'b'], ['1', '2']])
+    w.write_row(['3', '4'])
+    w.flush()
+    assert out.getvalue() == to_str('a,b\r\n1,2\r\n3,4\r\n')
+
+
+class CountingIO(io.StringIO):
+    writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super(CountingIO, self).write(s)
+
+    def close(self):
+        self.value = self.getvalue()
+        super(CountingIO, self).close()
+
+
+@pytest.mark.parametrize('background', [False, True])
+def test_buffered_writer(tmpdir, background):
+    rows = [[str(i), 'row {}'.format(i)] for i in range(1000)]
+
+    out = CountingIO()
+    with Writer(out, buffer_size=1000, background=background) as w:
+        w.write_rows(rows[:500])
+        for row in rows[500:]:
+            w.write_row(row)
+        assert w.row_count == 1000
+
+    expected = ''.join('{},{}\r\n'.format(*r) for r in rows)
+    assert out.value == expected
+    assert 0 < out.writes < 20
+
+    path = str(tmpdir / 'test.csv.gz')
+    with DictWriter(path, buffer_size=100, background=background) as w:
+        w.write_dicts(OrderedDict([('a', r[0]), ('b', r[1])]) for r in rows)
+
+    with Reader(path) as r:
+        assert list(r) == [['a', 'b']] + rows
+
+
+class BrokenIO(io.StringIO):
+    def write(self, s):
+        raise IOError('disk full')
+
+
+def test_background_write_error():
+    out = BufferedOutput(BrokenIO(), buffer_size=10, background=True)
+    out.write('0123456789')
+    out.queue.join()  # wait for the block to fail
+
+    with pytest.raises(IOError):
+        out.write('more')
+    out.close()
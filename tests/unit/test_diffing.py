@@ -0,0 +1,84 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+
+import csvx
+from csvx import Change, Writer
+from csvx.cli import main
+
+import pytest
+
+OLD = [['id', 'name', 'score']] + \
+    [[str(i), 'name {}'.format(i), str(i * 2)] for i in range(10, 30)]
+
+NEW = [['id', 'score', 'name', 'extra']] + \
+    [[str(i), str(i * 2 if i % 5 else i), 'name {}'.format(i), '']
+     for i in range(10, 30) if i % 7] + \
+    [['30', '60', 'name 30', 'x']]
+
+
+def write(path, rows):
+    with Writer(path) as w:
+        w.write_rows(rows)
+
+
+@pytest.mark.parametrize('strategy', ['hash', 'merge', 'partitioned'])
+def test_diff(tmpdir, strategy):
+    old = str(tmpdir / 'old.csv')
+    new = str(tmpdir / 'new.csv')
+    write(old, OLD)
+    write(new, NEW)
+
+    kw = dict(memory=100) if strategy == 'partitioned' else \
+        dict(strategy=strategy)
+    changes = list(csvx.diff(old, new, key='id', **kw))
+    kinds = {}
+
+    for c in changes:
+        assert isinstance(c, Change)
+        kinds.setdefault(c.kind, []).append(c)
+
+    assert sorted(c.key for c in kinds['removed']) == ['14', '21', '28']
+    assert [c.key for c in kinds['added']] == ['30']
+    assert kinds['added'][0].new['extra'] == 'x'
+    assert sorted(c.key for c in kinds['changed']) == ['10', '15', '20', '25']
+
+    c = [c for c in kinds['changed'] if c.key == '15'][0]
+    assert c.changes == {'score': ('30', '15')}
+    assert c.old['name'] == c.new['name'] == 'name 15'
+
+
+def test_diff_errors(tmpdir):
+    old = str(tmpdir / 'old.csv')
+    new = str(tmpdir / 'new.csv')
+    write(old, OLD + [OLD[1]])
+    write(new, NEW)
+
+    with pytest.raises(ValueError):
+        list(csvx.diff(old, new, key='id'))
+
+    write(old, OLD[:1] + OLD[:0:-1])
+    with pytest.raises(ValueError):
+        list(csvx.diff(old, new, key='id', strategy='merge'))
+
+
+def test_cli(tmpdir):
+    old = str(tmpdir / 'old.csv')
+    new = str(tmpdir / 'new.csv')
+    write(old, OLD)
+    write(new, NEW)
+
+    out = io.StringIO()
+    assert main(['diff', old, new, '-k', 'id', '--strategy', 'merge'],
+                out) == 1
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == 'change,id,column,old,new'
+    assert 'changed,15,score,30,15' in lines
+    assert 'removed,14,,,' in lines
+    assert 'added,30,,,' in lines
+
+    out = io.StringIO()
+    assert main(['diff', old, old, '-k', 'id', '-k', 'name'], out) == 0
+    assert out.getvalue().splitlines() == ['change,id,name,column,old,new']
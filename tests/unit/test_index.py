@@ -0,0 +1,103 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from csvx import Reader, OrderedDictReader, Writer
+from csvx.index import RowIndex, build_index, index_path
+
+import io
+import os
+
+import pytest
+
+ROWS = [['id', 'text']] + \
+    [[str(i), 'quoted,\nover "two" lines' if i % 4 else 'plain']
+     for i in range(100)]
+
+
+def test_index(tmpdir):
+    path = str(tmpdir / 'test.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS[:50])
+        w.write_row([])
+        w.write_rows(ROWS[50:])
+
+    index = build_index(path, every=7, save=False)
+    assert len(index) == 101
+    assert RowIndex.load(path) is None
+
+    with Reader(path, index=7) as r:
+        assert r.count_rows() == 101
+        assert r[0] == ROWS[0]
+        assert r[60] == ROWS[60]
+        assert r[-1] == ROWS[-1]
+        assert r[10:20] == ROWS[10:20]
+        assert r[95:200:2] == ROWS[95::2]
+        assert r[45:55] == ROWS[45:55]
+        assert r[60:40:-3] == ROWS[60:40:-3]
+        assert r[::-1] == ROWS[::-1]
+        assert r[20:10] == []
+
+        r.seek_row(48)
+        assert next(r) == ROWS[48]
+        assert next(r) == ROWS[49]
+        assert next(r) == []
+        assert next(r) == ROWS[50]
+
+        with pytest.raises(IndexError):
+            r.seek_row(101)
+
+    assert os.path.exists(index_path(path))
+    assert len(RowIndex.load(path)) == 101
+
+    with OrderedDictReader(path, index=True, columns=['text'],
+                           where={'text': 'plain'}) as r:
+        assert r.count_rows() == 100
+        r.seek_row(5)
+        assert next(r)['text'] == 'plain'
+        assert r[8] == {'text': 'plain'}
+        assert r[0:8] == [{'text': 'plain'}] * 2
+
+    with io.open(path, 'a') as f:
+        f.write('100,more\r\n')
+
+    assert RowIndex.load(path) is None
+
+    with OrderedDictReader(path, index=True) as r:
+        assert r.count_rows() == 101
+        assert r[100]['text'] == 'more'
+
+    with Reader(path) as r:
+        assert len(list(r)) == 103
+
+        with pytest.raises(TypeError):
+            r.count_rows()
+
+    with pytest.raises(TypeError):
+        Reader(io.open(path), index=True)
+
+    with pytest.raises(ValueError):
+        Reader(path, index=True, encoding='utf-16')
+
+
+def test_index_not_saved(tmpdir, monkeypatch):
+    path = str(tmpdir / 'test.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS)
+
+    with Reader(path, index=True) as r:
+        assert list(r) == ROWS
+
+    assert not os.path.exists(index_path(path))
+
+    def read_only(self, path):
+        raise IOError('read-only file system')
+
+    monkeypatch.setattr(RowIndex, 'save', read_only)
+
+    with Reader(path, index=True) as r:
+        assert r.count_rows() == 101
+        assert r[-1] == ROWS[-1]
+
+    assert not os.path.exists(index_path(path))
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import csvx
+from csvx import Reader, Writer
+
+import pytest
+
+PEOPLE = [['id', 'name', 'team']] + \
+    [[str(i), 'person {}'.format(i), str(i % 4)] for i in range(10)]
+
+TEAMS = [['team', 'name', 'floor']] + \
+    [[str(i), 'team {}'.format(i), str(i + 1)] for i in range(2, 6)] + \
+    [['3', 'team 3 again', '9']]
+
+
+def expected(how):
+    teams = {}
+    for row in TEAMS[1:]:
+        teams.setdefault(row[0], []).append(row)
+
+    rows = []
+    for person in PEOPLE[1:]:
+        matches = teams.get(person[2], [])
+        rows += [person + team[1:] for team in matches]
+        if not matches and how in ('left', 'outer'):
+            rows.append(person + ['', ''])
+
+    if how in ('right', 'outer'):
+        used = set(p[2] for p in PEOPLE[1:])
+        rows += [['', '', t[0]] + t[1:] for t in TEAMS[1:]
+                 if t[0] not in used]
+    return rows
+
+
+def write(path, rows):
+    with Writer(path) as w:
+        w.write_rows(rows)
+
+
+@pytest.mark.parametrize('how', ['inner', 'left', 'right', 'outer'])
+@pytest.mark.parametrize('strategy', ['hash', 'merge', 'grace', 'auto'])
+def test_join(tmpdir, how, strategy):
+    people = str(tmpdir / 'people.csv')
+    teams = str(tmpdir / 'teams.csv')
+    out = str(tmpdir / 'out.csv')
+
+    if strategy == 'merge':
+        write(people, PEOPLE[:1] + sorted(PEOPLE[1:], key=lambda r: r[2]))
+        write(teams, TEAMS[:1] + sorted(TEAMS[1:], key=lambda r: r[0]))
+    else:
+        write(people, PEOPLE)
+        write(teams, TEAMS)
+
+    n = csvx.join(people, teams, out, on='team', how=how,
+                  strategy=strategy, memory=50 if strategy == 'grace' else
+                  10 ** 6)
+
+    with Reader(out) as r:
+        rows = list(r)
+
+    assert rows[0] == ['id', 'name', 'team', 'name_right', 'floor']
+    assert n == len(rows) - 1
+    assert sorted(rows[1:]) == sorted(expected(how))
+
+    if strategy == 'hash' and how == 'inner':
+        assert [r[0] for r in rows[1:]] == \
+            [p[0] for p in PEOPLE[1:] for t in TEAMS[1:] if p[2] == t[0]]
+
+
+def test_merge_join_unsorted(tmpdir):
+    people = str(tmpdir / 'people.csv')
+    teams = str(tmpdir / 'teams.csv')
+    write(people, PEOPLE)
+    write(teams, TEAMS)
+
+    with pytest.raises(ValueError):
+        csvx.join(people, teams, str(tmpdir / 'out.csv'), on='team',
+                  strategy='merge')
+
+
+@pytest.mark.parametrize('strategy', ['hash', 'grace'])
+def test_join_encoding(tmpdir, strategy):
+    people = str(tmpdir / 'people.csv')
+    teams = str(tmpdir / 'teams.csv')
+    out = str(tmpdir / 'out.csv')
+
+    with Writer(people, encoding='latin-1') as w:
+        w.write_rows([['name', 'team'], ['François', '1'], ['Zoë', '2']])
+
+    with Writer(teams, encoding='latin-1') as w:
+        w.write_rows([['team', 'city'], ['1', 'Málaga']])
+
+    csvx.join(people, teams, out, on='team', strategy=strategy, memory=10,
+              encoding='latin-1')
+
+    with Reader(out, encoding='latin-1') as r:
+        assert list(r) == [['name', 'team', 'city'],
+                           ['François', '1', 'Málaga']]
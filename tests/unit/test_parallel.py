@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from csvx import Reader, Writer, ParallelReader, ParallelWriter
+from csvx.records import chunk_offsets
+
+import io
+
+import pytest
+
+ROWS = [['id', 'text', 'amount']] + \
+    [[i, 'François "quoted",\nover two lines' if i % 3 else 'plain',
+      i * 1.5] for i in range(500)]
+
+
+def test_parallel_reader(tmpdir):
+    path = str(tmpdir / 'test.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS)
+
+    with Reader(path) as r:
+        expected = list(r)
+
+    with io.open(path, 'rb') as f:
+        data = f.read()
+
+    offsets = chunk_offsets(io.BytesIO(data), 1000)
+    assert offsets[0] == 0
+    assert offsets[-1] == len(data)
+    assert chunk_offsets(io.BytesIO(data), 1000, block_size=7) == offsets
+
+    for start in offsets[1:-1]:
+        assert data[start - 1:start] == b'\n'
+
+    with ParallelReader(path, workers=2, chunk_size=1000) as r:
+        assert list(r) == expected
+
+    with ParallelReader(path, workers=2, chunk_size=1000, ordered=False,
+                        header=True) as r:
+        assert r.fieldnames == expected[0]
+        assert sorted(r) == sorted(expected[1:])
+
+    with pytest.raises(ValueError):
+        ParallelReader(path, encoding='utf-16')
+
+
+def test_quoted_newlines_kept(tmpdir):
+    path = str(tmpdir / 'test.csv')
+
+    with io.open(path, 'wb') as f:
+        f.write(b'1,"x\r\ny"\r\n2,"a\rb"\r\n')
+
+    expected = [['1', 'x\r\ny'], ['2', 'a\rb']]
+
+    with Reader(path) as r:
+        assert list(r) == expected
+
+    with Reader(io.open(path, 'rb')) as r:
+        assert list(r) == expected
+
+    with ParallelReader(path, workers=2) as r:
+        assert list(r) == expected
+
+
+def test_parallel_writer(tmpdir):
+    serial = str(tmpdir / 'serial.csv')
+    parallel = str(tmpdir / 'parallel.csv')
+
+    with Writer(serial, delimiter=';') as w:
+        w.write_row(ROWS[0])
+        w.write_rows(ROWS[1:])
+
+    with ParallelWriter(parallel, workers=2, chunk_size=7,
+                        delimiter=';') as w:
+        w.write_row(ROWS[0])
+        assert w.row_count == 1
+        w.write_rows(ROWS[1:300])
+        assert w.row_count == 300
+        for row in ROWS[300:]:
+            w.write_row(row)
+        w.flush()
+        assert w.row_count == len(ROWS)
+
+    with io.open(serial, 'rb') as a, io.open(parallel, 'rb') as b:
+        assert a.read() == b.read()
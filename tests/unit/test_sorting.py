@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import csvx
+from csvx import Reader, Writer
+
+import pytest
+
+ROWS = [['id', 'name', 'score']] + \
+    [[str(i), 'name "{}",\n{}'.format(i % 7, i), str((i * 37) % 11) if i % 5
+      else ''] for i in range(200)]
+
+
+@pytest.mark.parametrize('memory', [10 ** 9, 2000, 300])
+@pytest.mark.parametrize('workers', [None, 2])
+def test_sort(tmpdir, monkeypatch, memory, workers):
+    monkeypatch.setattr('csvx.sorting.MAX_MERGE', 3)  # merge in passes
+    in_path = str(tmpdir / 'in.csv')
+    out_path = str(tmpdir / 'out.csv.gz')
+
+    with Writer(in_path) as w:
+        w.write_rows(ROWS)
+        w.write_row([])
+
+    n = csvx.sort(in_path, out_path, key='score', types={'score': int},
+                  memory=memory, workers=workers)
+    assert n == 200
+
+    with Reader(out_path) as r:
+        rows = list(r)
+
+    def key(row):
+        return (row[2] != '', int(row[2]) if row[2] else None)
+
+    assert rows[0] == ROWS[0]
+    assert rows[1:] == sorted(ROWS[1:], key=key)
+
+    csvx.sort(in_path, out_path, key=['name', 'id'], reverse=True,
+              memory=memory)
+
+    with Reader(out_path) as r:
+        rows = list(r)
+
+    assert rows[1:] == sorted(ROWS[1:], key=lambda row: row[1:2] + row[:1],
+                              reverse=True)
+
+
+def test_sort_no_header(tmpdir):
+    in_path = str(tmpdir / 'in.csv')
+    out_path = str(tmpdir / 'out.csv')
+
+    with Writer(in_path) as w:
+        w.write_rows(ROWS[1:])
+
+    csvx.sort(in_path, out_path, key=0, types={0: 'int'}, header=False,
+              reverse=True, memory=500)
+
+    with Reader(out_path) as r:
+        assert list(r) == ROWS[:0:-1]
+
+    with pytest.raises(KeyError):
+        csvx.sort(in_path, out_path, key='id')
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_sort_encoding(tmpdir, workers):
+    in_path = str(tmpdir / 'in.csv')
+    out_path = str(tmpdir / 'out.csv')
+    rows = [['name'], ['Zoë'], ['François'], ['Åsa']]
+
+    with Writer(in_path, encoding='latin-1') as w:
+        w.write_rows(rows)
+
+    csvx.sort(in_path, out_path, key='name', memory=30, workers=workers,
+              encoding='latin-1')
+
+    with Reader(out_path, encoding='latin-1') as r:
+        assert list(r) == [rows[0]] + sorted(rows[1:])
@@ -0,0 +1,82 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import os
+
+import csvx
+from csvx import Reader, Writer
+
+import pytest
+
+ROWS = [['id', 'group', 'text']] + \
+    [[str(i), 'g{}'.format(i % 5), 'quoted "text",\nover two lines'
+      if i % 3 else 'plain'] for i in range(100)]
+
+
+@pytest.mark.parametrize('how', [dict(rows=30), dict(size=500),
+                                 dict(key='group', parts=3)])
+def test_split_and_concat(tmpdir, how):
+    path = str(tmpdir / 'in.csv')
+
+    with Writer(path) as w:
+        w.write_rows(ROWS)
+        w.write_row([])
+
+    parts = csvx.split(path, str(tmpdir / 'part-{}.csv'), **how)
+    if 'rows' in how:
+        assert len(parts) == 4
+    if 'key' in how:
+        assert len(parts) == 3
+
+    found = []
+    groups = []
+    for p in parts:
+        with Reader(p) as r:
+            rows = list(r)
+        assert rows[0] == ROWS[0]
+        found += rows[1:]
+
+        if 'size' in how:
+            assert os.path.getsize(p) <= 500 or len(rows) == 2
+        groups += set(row[1] for row in rows[1:])
+
+    assert sorted(found) == sorted(ROWS[1:])
+
+    if 'key' in how:
+        assert sorted(groups) == ['g0', 'g1', 'g2', 'g3', 'g4']
+    if 'size' in how:
+        assert len(parts) > 4
+
+    out = str(tmpdir / 'out.csv')
+    csvx.concat(parts, out)
+
+    with Reader(out) as r:
+        rows = list(r)
+    assert rows[0] == ROWS[0]
+    assert sorted(rows[1:]) == sorted(ROWS[1:])
+
+    if 'key' not in how:
+        assert rows == ROWS
+
+
+def test_concat(tmpdir):
+    a, b, out = [str(tmpdir / n) for n in ('a.csv', 'b.csv', 'out.csv')]
+
+    with io.open(a, 'wb') as f:
+        f.write(b'x,y\n1,2')
+    with io.open(b, 'wb') as f:
+        f.write(b'x,y\n3,4\n')
+
+    csvx.concat([a, b], out)
+    with io.open(out, 'rb') as f:
+        assert f.read() == b'x,y\n1,2\r\n3,4\n'
+
+    with io.open(b, 'wb') as f:
+        f.write(b'x,z\n3,4\n')
+
+    with pytest.raises(ValueError):
+        csvx.concat([a, b], out)
+
+    with pytest.raises(ValueError):
+        csvx.split(a, out, rows=1, size=1)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import json
+
+import pytest
+
+from csvx import Checkpoint, TailReader, Writer
+
+
+def append(path, data):
+    with io.open(path, 'ab') as f:
+        f.write(data.encode('utf-8'))
+
+
+def test_tail(tmpdir):
+    path = str(tmpdir / 'log.csv')
+    append(path, 'id,message\r\n1,hello\r\n2,"multi\nline (')
+
+    with TailReader(path) as r:
+        assert list(r) == [['1', 'hello']]
+        assert r.fieldnames == ['id', 'message']
+        checkpoint = r.checkpoint
+
+    assert checkpoint == (len('id,message\r\n1,hello\r\n'), ['id', 'message'])
+
+    append(path, 'é)"\r\n\r\n3,')
+    saved = json.loads(json.dumps(checkpoint))
+
+    with TailReader(path, checkpoint=saved) as r:
+        assert list(r) == [['2', 'multi\nline (é)']]
+        checkpoint = r.checkpoint
+
+        append(path, 'three\r\n')
+        assert list(r) == [['3', 'three']]
+
+    with TailReader(path, checkpoint=checkpoint) as r:
+        assert list(r) == [['3', 'three']]
+
+    with TailReader(path, header=False) as r:
+        assert next(r) == ['id', 'message']
+        assert r.fieldnames is None
+
+    with pytest.raises(ValueError):
+        TailReader(path, encoding='utf-16')
+
+
+def test_follow(tmpdir):
+    path = str(tmpdir / 'log.csv')
+    append(path, '')
+
+    with TailReader(path, follow=True, interval=0.01, timeout=0.05) as r:
+        assert list(r) == []
+        append(path, 'a,b\n1,2\n3')
+        assert next(r) == ['1', '2']
+        append(path, ',4\n')
+        assert next(r) == ['3', '4']
+        assert list(r) == []
+        assert r.checkpoint == Checkpoint(12, ['a', 'b'])
+
+
+def test_small_blocks(tmpdir, monkeypatch):
+    monkeypatch.setattr('csvx.tail.BLOCK_SIZE', 5)
+    path = str(tmpdir / 'log.csv')
+    rows = [['id', 'message']] + \
+        [[str(i), 'quoted "{}",\nline'.format(i)] for i in range(20)]
+
+    with Writer(path) as w:
+        w.write_rows(rows)
+
+    with TailReader(path) as r:
+        assert next(r) == rows[1]
+        assert r.f.tell() < 100
+        assert list(r) == rows[2:]